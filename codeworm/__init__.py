@@ -2,21 +2,27 @@
 ⒸAngelaMos | 2026
 __init__.py
 """
-from codeworm.core import (
-    CodeWormSettings,
-    StateManager,
-    configure_logging,
-    get_logger,
-    get_settings,
-    load_settings,
-)
-from codeworm.models import (
-    AnalysisResult,
-    CodeSnippet,
-    DocumentedSnippet,
-    Language,
-    RepoConfig,
-)
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from codeworm.core import (
+        CodeWormSettings,
+        StateManager,
+        configure_logging,
+        get_logger,
+        get_settings,
+        load_settings,
+    )
+    from codeworm.models import (
+        AnalysisResult,
+        CodeSnippet,
+        DocumentedSnippet,
+        Language,
+        RepoConfig,
+    )
 
 
 __version__ = "0.1.0"
@@ -34,3 +40,29 @@ __all__ = [
     "get_settings",
     "load_settings",
 ]
+
+_LAZY_EXPORTS: dict[str, str] = {
+    "AnalysisResult": "codeworm.models",
+    "CodeSnippet": "codeworm.models",
+    "CodeWormSettings": "codeworm.core",
+    "DocumentedSnippet": "codeworm.models",
+    "Language": "codeworm.models",
+    "RepoConfig": "codeworm.models",
+    "StateManager": "codeworm.core",
+    "configure_logging": "codeworm.core",
+    "get_logger": "codeworm.core",
+    "get_settings": "codeworm.core",
+    "load_settings": "codeworm.core",
+}
+
+
+def __getattr__(name: str) -> Any:
+    """
+    Import public names on first access so importing a submodule stays cheap
+    """
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
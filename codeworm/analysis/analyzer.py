@@ -4,17 +4,33 @@ analysis/analyzer.py
 """
 from __future__ import annotations
 
+import heapq
+import itertools
+import math
+import multiprocessing
+import os
 import random
-from dataclasses import dataclass
+import signal
+import sys
+import zlib
+from collections import OrderedDict
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+)
+from dataclasses import dataclass, field
+from datetime import datetime
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, ClassVar
 
 from git import InvalidGitRepositoryError, Repo
 
 from codeworm.analysis.complexity import ComplexityAnalyzer, ComplexityMetrics
-from codeworm.analysis.parser import CodeExtractor, ParsedFunction, ParserManager
+from codeworm.analysis.parser import ParsedFunction, ParserManager, parse_file
 from codeworm.analysis.scanner import RepoScanner, ScannedFile, WeightedRepoSelector
 from codeworm.analysis.scoring import GitStats, InterestScore, InterestScorer
+from codeworm.core.cache import DEFAULT_CACHE_DIR, DiskCache
 from codeworm.models import CodeSnippet
 
 if TYPE_CHECKING:
@@ -23,28 +39,110 @@ if TYPE_CHECKING:
     from codeworm.core.config import AnalyzerSettings, RepoEntry
 
 
-@dataclass
+ANALYSIS_CACHE_VERSION = 9
+
+PRIVATE_KEEP_THRESHOLD = 307
+
+SKIP_NAMES = frozenset(
+    {
+        "__init__",
+        "__str__",
+        "__repr__",
+        "main",
+        "setUp",
+        "tearDown",
+    }
+)
+
+
+@dataclass(slots = True)
 class AnalysisCandidate:
     """
     A code snippet candidate for documentation
     """
-    snippet: CodeSnippet
+    MIN_LINES: ClassVar[int] = 10
+
     parsed_function: ParsedFunction
     complexity: ComplexityMetrics | None
     git_stats: GitStats
     interest_score: InterestScore
     scanned_file: ScannedFile
+    _snippet: CodeSnippet | None = field(default = None, repr = False)
+
+    @property
+    def snippet(self) -> CodeSnippet:
+        """
+        CodeSnippet for this candidate, built on first access
+        Most candidates are ranked and discarded without ever needing one
+        """
+        if self._snippet is None:
+            func = self.parsed_function
+            complexity = self.complexity
+            self._snippet = CodeSnippet(
+                repo = self.scanned_file.repo_name,
+                file_path = self.scanned_file.path,
+                function_name = func.name,
+                class_name = func.class_name,
+                language = self.scanned_file.language,
+                source = func.source,
+                start_line = func.start_line,
+                end_line = func.end_line,
+                complexity = complexity.cyclomatic_complexity
+                if complexity else 0,
+                nesting_depth = complexity.max_nesting_depth
+                if complexity else 0,
+                parameter_count = complexity.parameter_count
+                if complexity else 0,
+                interest_score = self.interest_score.total,
+            )
+        return self._snippet
 
     @property
     def score(self) -> float:
         return self.interest_score.total
 
+    @property
+    def line_count(self) -> int:
+        return self.parsed_function.end_line - self.parsed_function.start_line + 1
+
     @property
     def is_worth_documenting(self) -> bool:
         """
         Check if this candidate meets minimum thresholds
         """
-        return self.score >= 25 and self.snippet.line_count >= 10
+        return self.score >= 25 and self.line_count >= self.MIN_LINES
+
+
+class TopCandidates:
+    """
+    Bounded min-heap keeping the highest scoring candidates seen so far
+    """
+    def __init__(self, limit: int) -> None:
+        """
+        Initialize with the number of candidates to keep
+        """
+        self.limit = limit
+        self._heap: list[tuple[float, int, AnalysisCandidate]] = []
+        self._counter = itertools.count()
+
+    def push(self, candidate: AnalysisCandidate) -> None:
+        """
+        Offer a candidate, displacing the lowest score once full
+        """
+        if self.limit <= 0:
+            return
+        entry = (candidate.score, -next(self._counter), candidate)
+        if len(self._heap) < self.limit:
+            heapq.heappush(self._heap, entry)
+        elif entry[: 2] > self._heap[0][: 2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def results(self) -> list[AnalysisCandidate]:
+        """
+        Kept candidates ordered by descending score
+        """
+        ordered = sorted(self._heap, key = lambda e: e[: 2], reverse = True)
+        return [candidate for _, _, candidate in ordered]
 
 
 class CodeAnalyzer:
@@ -52,37 +150,56 @@ class CodeAnalyzer:
     Main code analysis engine
     Combines parsing, complexity analysis, and interest scoring
     """
+    PARALLEL_MIN_FILES = 32
+    MAX_SCAN_THREADS = 8
+    SEEN_PATHS_MAX = 4096
+
     def __init__(
         self,
         repos: list[RepoEntry],
         settings: AnalyzerSettings | None = None,
+        max_workers: int | None = None,
+        incremental: bool = True,
     ) -> None:
         """
         Initialize analyzer with repository configurations
+        With incremental, re-scanned files reuse their last syntax tree
         """
         self.repos = repos
         self.settings = settings
+        self.max_workers = max_workers or os.cpu_count() or 1
         self.repo_selector = WeightedRepoSelector(repos)
         self.scanner = RepoScanner(
             include_patterns = settings.include_patterns if settings else None,
             exclude_patterns = settings.exclude_patterns if settings else None,
         )
-        self.complexity_analyzer = ComplexityAnalyzer()
-        self.scorer = InterestScorer()
+        self._rng = random.Random()
 
-        self._git_repos: dict[Path, Repo | None] = {}
+        self._git_repos: dict[str, Repo | None] = {}
+        self._repo_roots = {
+            repo.name: sys.intern(str(repo.path.resolve()))
+            for repo in repos
+        }
+        self._executor: ProcessPoolExecutor | None = None
+        self.incremental = incremental
+        self._seen_paths: OrderedDict[str, None] = OrderedDict()
+        self._analysis_cache: DiskCache | None = None
+        if settings is None or settings.use_cache:
+            self._analysis_cache = DiskCache(DEFAULT_CACHE_DIR / "analysis.db")
+        self.complexity_analyzer = ComplexityAnalyzer(cache = self._analysis_cache)
+        self.scorer = InterestScorer(cache = self._analysis_cache)
 
         ParserManager.initialize()
 
-    def _get_git_repo(self, repo_path: Path) -> Repo | None:
+    def _get_git_repo(self, repo_path: str) -> Repo | None:
         """
-        Get or create git repo instance for a path
+        Get or create git repo instance for a directory path string
         """
         if repo_path in self._git_repos:
             return self._git_repos[repo_path]
         try:
             repo = Repo(repo_path, search_parent_directories = True)
-            git_root = Path(repo.working_dir)
+            git_root = str(repo.working_dir)
             if git_root in self._git_repos:
                 repo.close()
                 self._git_repos[repo_path] = self._git_repos[git_root]
@@ -93,6 +210,16 @@ class CodeAnalyzer:
             self._git_repos[repo_path] = None
         return self._git_repos[repo_path]
 
+    def _get_git_repo_for(self, scanned_file: ScannedFile) -> Repo | None:
+        """
+        Get the shared git repo for the configured repo a file belongs to
+        Files from unknown repos fall back to discovery from their directory
+        """
+        repo_root = self._repo_roots.get(scanned_file.repo_name)
+        if repo_root is None:
+            return self._get_git_repo(os.path.dirname(scanned_file.path))  # noqa: PTH120
+        return self._get_git_repo(repo_root)
+
     def close_repos(self) -> None:
         """
         Close all cached git repo handles and clear the cache
@@ -107,113 +234,204 @@ class CodeAnalyzer:
                     pass
         self._git_repos.clear()
 
+    def shutdown(self) -> None:
+        """
+        Close git handles, the analysis cache, and the worker pool
+        """
+        self.close_repos()
+        if self._analysis_cache is not None:
+            self._analysis_cache.close()
+        if self._executor is not None:
+            self._executor.shutdown(wait = True, cancel_futures = True)
+            self._executor = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """
+        Lazily start the worker pool used for per-file analysis
+        Workers are spawned rather than forked so they never inherit
+        the daemon's threads, signal handlers, or Redis connection
+        """
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers = self.max_workers,
+                mp_context = multiprocessing.get_context("spawn"),
+                initializer = _init_worker,
+                initargs = (self.repos,
+                            self.settings),
+            )
+        return self._executor
+
     def analyze_file(self,
                      scanned_file: ScannedFile) -> Iterator[AnalysisCandidate]:
         """
         Analyze a single file and yield documentation candidates
+        Functions too short to ever be worth documenting are skipped before
+        any git or scoring work
         """
-        try:
-            source = scanned_file.path.read_text(encoding = "utf-8")
-        except Exception:
-            return
-
-        try:
-            extractor = CodeExtractor(source, scanned_file.language)
-        except Exception:
+        parsed = self._parse_and_measure(scanned_file)
+        if parsed is None:
             return
 
-        complexity_results = self.complexity_analyzer.analyze_source(
-            source,
-            str(scanned_file.path),
-        )
+        parsed_functions, complexity_results = parsed
         complexity_map = {m.name: m for m in complexity_results}
+        suffix_index: dict[str, ComplexityMetrics] = {}
+        for metrics in complexity_results:
+            if "." in metrics.name:
+                suffix_index.setdefault(metrics.name.rsplit(".", 1)[-1], metrics)
 
-        git_repo = self._get_git_repo(scanned_file.path.parent)
+        git_repo = self._get_git_repo_for(scanned_file)
         if git_repo:
             self.scorer.git_repo = git_repo
+        blame_primed = False
+        now = datetime.now()
 
-        for parsed_func in extractor.extract_functions():
+        measured: list[tuple[ParsedFunction,
+                             ComplexityMetrics | None,
+                             GitStats]] = []
+        for parsed_func in parsed_functions:
             try:
                 if self._should_skip_function(parsed_func):
                     continue
 
-                complexity = complexity_map.get(parsed_func.name)
-                if not complexity:
-                    for name, metrics in complexity_map.items():
-                        if name.endswith(f".{parsed_func.name}"):
-                            complexity = metrics
-                            break
+                line_count = parsed_func.end_line - parsed_func.start_line + 1
+                if line_count < AnalysisCandidate.MIN_LINES:
+                    continue
+
+                if git_repo and not blame_primed:
+                    self.scorer.prime_file_blame(scanned_file.path)
+                    blame_primed = True
+
+                complexity = (
+                    parsed_func.complexity
+                    or complexity_map.get(parsed_func.name)
+                    or suffix_index.get(parsed_func.name)
+                )
 
                 git_stats = self.scorer.get_git_stats(
                     scanned_file.path,
                     parsed_func.start_line,
                     parsed_func.end_line,
+                    now,
                 )
+            except Exception:  # noqa: S112
+                continue
+            measured.append((parsed_func, complexity, git_stats))
 
-                if complexity:
-                    interest = self.scorer.score(
+        try:
+            scores = iter(
+                self.scorer.score_batch(
+                    (
                         complexity,
                         git_stats,
                         parsed_func.decorators,
                         parsed_func.is_async,
                         parsed_func.source,
-                    )
-                else:
-                    interest = InterestScore(
-                        total = 20,
-                        complexity_score = 0,
-                        length_score = 0,
-                        nesting_score = 0,
-                        parameter_score = 0,
-                        churn_score = 0,
-                        novelty_score = 0,
-                    )
-
-                snippet = CodeSnippet(
-                    repo = scanned_file.repo_name,
-                    file_path = scanned_file.path,
-                    function_name = parsed_func.name,
-                    class_name = parsed_func.class_name,
-                    language = scanned_file.language,
-                    source = parsed_func.source,
-                    start_line = parsed_func.start_line,
-                    end_line = parsed_func.end_line,
-                    complexity = complexity.cyclomatic_complexity
-                    if complexity else 0,
-                    nesting_depth = complexity.max_nesting_depth
-                    if complexity else 0,
-                    parameter_count = complexity.parameter_count
-                    if complexity else 0,
-                    interest_score = interest.total,
+                    ) for parsed_func, complexity, git_stats in measured
+                    if complexity
                 )
+            )
+        except Exception:
+            return
 
-                yield AnalysisCandidate(
-                    snippet = snippet,
-                    parsed_function = parsed_func,
-                    complexity = complexity,
-                    git_stats = git_stats,
-                    interest_score = interest,
-                    scanned_file = scanned_file,
+        for parsed_func, complexity, git_stats in measured:
+            if complexity:
+                interest = next(scores)
+            else:
+                interest = InterestScore(
+                    total = 20,
+                    complexity_score = 0,
+                    length_score = 0,
+                    nesting_score = 0,
+                    parameter_score = 0,
+                    churn_score = 0,
+                    novelty_score = 0,
                 )
-            except Exception:  # noqa: S112
-                continue
+
+            yield AnalysisCandidate(
+                parsed_function = parsed_func,
+                complexity = complexity,
+                git_stats = git_stats,
+                interest_score = interest,
+                scanned_file = scanned_file,
+            )
+
+    def _parse_and_measure(
+        self,
+        scanned_file: ScannedFile,
+    ) -> tuple[list[ParsedFunction],
+               list[ComplexityMetrics]] | None:
+        """
+        Parse functions and measure complexity for a file
+        Lizard only runs when the tree-sitter pass could not measure
+        Results are cached on disk keyed by path, mtime, and size
+        Trees are only kept for incremental reparsing once a path comes
+        back for a re-scan, so a first pass over a repo caches nothing
+        Seen paths are bounded to the most recent SEEN_PATHS_MAX
+        """
+        path_str = str(scanned_file.path)
+        rescan = False
+        if self.incremental:
+            rescan = path_str in self._seen_paths
+            self._seen_paths[path_str] = None
+            self._seen_paths.move_to_end(path_str)
+            if len(self._seen_paths) > self.SEEN_PATHS_MAX:
+                self._seen_paths.popitem(last = False)
+        cache = self._analysis_cache
+        cache_key = None
+        if cache is not None:
+            try:
+                stat = os.stat(path_str)  # noqa: PTH116
+            except OSError:
+                return None
+            cache_key = (
+                f"{ANALYSIS_CACHE_VERSION}:{path_str}:"
+                f"{stat.st_mtime_ns}:{stat.st_size}"
+            )
+            cached: tuple[list[ParsedFunction],
+                          list[ComplexityMetrics]] | None = cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        extractor = None
+        source = None
+        try:
+            extractor = parse_file(
+                scanned_file.path,
+                scanned_file.language,
+                measure_complexity = True,
+                incremental = rescan,
+            )
+            parsed_functions = list(extractor.extract_functions())
+            if any(func.complexity is None for func in parsed_functions):
+                source = extractor.source
+        except Exception:
+            return None
+        finally:
+            if extractor is not None:
+                extractor.close()
+
+        complexity_results: list[ComplexityMetrics] = []
+        if source is not None:
+            complexity_results = self.complexity_analyzer.analyze_source(
+                source,
+                path_str,
+            )
+
+        result = (parsed_functions, complexity_results)
+        if cache is not None and cache_key is not None:
+            cache.set(cache_key, result)
+        return result
 
     def _should_skip_function(self, func: ParsedFunction) -> bool:
         """
         Check if function should be skipped from analysis
+        Private helpers are sampled by a stable hash so runs and workers agree
         """
         if func.name.startswith("_") and not func.name.startswith("__"):
-            return random.random() > 0.3
-
-        skip_names = {
-            "__init__",
-            "__str__",
-            "__repr__",
-            "main",
-            "setUp",
-            "tearDown"
-        }
-        if func.name in skip_names:
+            key = f"{func.name}:{func.start_line}".encode()
+            return (zlib.crc32(key) & 0x3FF) >= PRIVATE_KEEP_THRESHOLD
+
+        if func.name in SKIP_NAMES:
             return True
 
         line_count = func.end_line - func.start_line + 1
@@ -233,22 +451,86 @@ class CodeAnalyzer:
         """
         Find documentation candidates from repositories
         """
-        candidates: list[AnalysisCandidate] = []
-
         repos_to_scan = [repo] if repo else [r for r in self.repos if r.enabled]
-
-        for repo_config in repos_to_scan:
-            for scanned_file in self.scanner.scan_repo(repo_config.path,
-                                                       repo_config.name):
+        scanned_files = self._scan_repos(repos_to_scan)
+
+        top = TopCandidates(limit)
+        if (self.max_workers > 1
+                and len(scanned_files) >= self.PARALLEL_MIN_FILES):
+            for candidate in self._analyze_parallel(scanned_files):
+                top.push(candidate)
+        else:
+            for scanned_file in scanned_files:
                 for candidate in self.analyze_file(scanned_file):
                     if candidate.is_worth_documenting:
-                        candidates.append(candidate)
+                        top.push(candidate)
+
+        return top.results()
+
+    def _scan_repos(self, repos: list[RepoEntry]) -> list[ScannedFile]:
+        """
+        Walk repositories concurrently, keeping files in configured repo order
+        """
+        if len(repos) <= 1:
+            return [
+                scanned_file for repo_config in repos for scanned_file in
+                self.scanner.scan_repo(repo_config.path, repo_config.name)
+            ]
+
+        def scan(repo_config: RepoEntry) -> list[ScannedFile]:
+            return list(
+                self.scanner.scan_repo(repo_config.path,
+                                       repo_config.name)
+            )
+
+        with ThreadPoolExecutor(
+                max_workers = min(self.MAX_SCAN_THREADS, len(repos))) as pool:
+            return [
+                scanned_file for files in pool.map(scan, repos)
+                for scanned_file in files
+            ]
+
+    def _analyze_parallel(
+        self,
+        scanned_files: list[ScannedFile],
+    ) -> Iterator[AnalysisCandidate]:
+        """
+        Fan files out to the worker pool and yield candidates as they arrive
+        Repo history walks are primed here first so workers read them from
+        the shared disk cache rather than each walking the same history
+        """
+        if self._analysis_cache is not None:
+            self._prime_repo_churn(scanned_files)
+
+        executor = self._get_executor()
+        futures = [
+            executor.submit(_analyze_file_worker,
+                            scanned_file) for scanned_file in scanned_files
+        ]
 
-                    if len(candidates) >= limit * 3:
-                        break
+        try:
+            for future in as_completed(futures):
+                try:
+                    yield from future.result()
+                except Exception:  # noqa: S112
+                    continue
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def _prime_repo_churn(self, scanned_files: list[ScannedFile]) -> None:
+        """
+        Build and persist the churn walk once for every repo in a batch
+        """
+        first_files: dict[str, ScannedFile] = {}
+        for scanned_file in scanned_files:
+            first_files.setdefault(scanned_file.repo_name, scanned_file)
 
-        candidates.sort(key = lambda c: c.score, reverse = True)
-        return candidates[: limit]
+        for scanned_file in first_files.values():
+            git_repo = self._get_git_repo_for(scanned_file)
+            if git_repo is not None:
+                self.scorer.git_repo = git_repo
+                self.scorer.prime_repo_churn()
 
     def select_for_documentation(
         self,
@@ -269,21 +551,53 @@ class CodeAnalyzer:
             return []
 
         if count >= len(eligible):
-            random.shuffle(eligible)
+            self._rng.shuffle(eligible)
             return eligible
 
-        selected: list[AnalysisCandidate] = []
-        remaining = list(eligible)
+        return heapq.nlargest(count, eligible, key = self._sample_key)
+
+    def _sample_key(self, candidate: AnalysisCandidate) -> float:
+        """
+        Efraimidis-Spirakis key, taking the top k keys samples k without
+        replacement with probability proportional to score in one pass
+        """
+        if candidate.score <= 0:
+            return -math.inf
+        return math.log(1.0 - self._rng.random()) / candidate.score
 
-        for _ in range(count):
-            if not remaining:
-                break
-            weights = [c.score for c in remaining]
-            chosen = random.choices(remaining, weights = weights, k = 1)[0]
-            selected.append(chosen)
-            remaining.remove(chosen)
 
-        return selected
+_worker_analyzer: CodeAnalyzer | None = None
+
+
+def _init_worker(
+    repos: list[RepoEntry],
+    settings: AnalyzerSettings | None,
+) -> None:
+    """
+    Build one analyzer per worker process so grammars load once
+    Ctrl-C is left to the parent which cancels outstanding work
+    Files land on arbitrary workers, so syntax trees are not kept
+    """
+    global _worker_analyzer
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _worker_analyzer = CodeAnalyzer(
+        repos,
+        settings,
+        max_workers = 1,
+        incremental = False,
+    )
+
+
+def _analyze_file_worker(scanned_file: ScannedFile) -> list[AnalysisCandidate]:
+    """
+    Analyze a single file inside a worker process
+    """
+    if _worker_analyzer is None:
+        return []
+    return [
+        candidate for candidate in _worker_analyzer.analyze_file(scanned_file)
+        if candidate.is_worth_documenting
+    ]
 
 
 def analyze_repository(repo_path: Path,
@@ -295,4 +609,7 @@ def analyze_repository(repo_path: Path,
 
     repo = RepoEntry(name = repo_name, path = repo_path, weight = 5)
     analyzer = CodeAnalyzer([repo])
-    return analyzer.find_candidates(repo)
+    try:
+        return analyzer.find_candidates(repo)
+    finally:
+        analyzer.shutdown()
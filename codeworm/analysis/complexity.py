@@ -4,7 +4,10 @@ analysis/complexity.py
 """
 from __future__ import annotations
 
-from dataclasses import dataclass
+import hashlib
+import os
+from array import array
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import TYPE_CHECKING
 
@@ -17,7 +20,43 @@ from codeworm.models import Language
 logger = get_logger("complexity")
 
 if TYPE_CHECKING:
-    from collections.abc import Iterator
+    from collections.abc import Iterable, Iterator
+
+    from codeworm.core.cache import DiskCache
+
+
+SKIP_DIRS = frozenset(
+    {
+        ".git",
+        "node_modules",
+        "target",
+        "__pycache__",
+    }
+)
+
+
+def _walk(root: Path,
+          exts: tuple[str, ...],
+          recursive: bool = True) -> Iterator[Path]:
+    """
+    Yield files under root ending in any of exts using a single scandir pass
+    """
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks = False):
+                            if recursive and entry.name not in SKIP_DIRS:
+                                stack.append(Path(entry.path))
+                        elif entry.name.endswith(exts) and entry.is_file():
+                            yield Path(entry.path)
+                    except OSError:
+                        continue
+        except OSError:
+            continue
 
 
 LANGUAGE_MAP: dict[Language,
@@ -30,8 +69,22 @@ LANGUAGE_MAP: dict[Language,
                        Language.RUST: "rust",
                    }
 
+EXT_MAP: dict[Language,
+              tuple[str,
+                    ...]] = {
+                        Language.PYTHON: (".py", ),
+                        Language.TYPESCRIPT: (".ts", ),
+                        Language.TSX: (".tsx", ),
+                        Language.JAVASCRIPT: (".js",
+                                              ".jsx"),
+                        Language.GO: (".go", ),
+                        Language.RUST: (".rs", ),
+                    }
+
+ALL_EXTS = tuple(ext for exts in EXT_MAP.values() for ext in exts)
 
-@dataclass
+
+@dataclass(slots = True)
 class ComplexityMetrics:
     """
     Complexity metrics for a function or method
@@ -76,7 +129,67 @@ class ComplexityMetrics:
         return "very_complex"
 
 
-@dataclass
+METRIC_COLUMNS = (
+    "cyclomatic_complexity",
+    "nloc",
+    "token_count",
+    "parameter_count",
+    "start_line",
+    "end_line",
+    "max_nesting_depth",
+    "fan_in",
+    "fan_out",
+)
+
+
+@dataclass(slots = True)
+class ComplexityMetricsTable:
+    """
+    Column-wise store for many ComplexityMetrics
+    Each numeric field is one int array instead of an attribute on one object
+    per function, which keeps memoized and cached results compact
+    """
+    names: list[str] = field(default_factory = list)
+    columns: tuple[array[int],
+                   ...] = field(
+                       default_factory = lambda: tuple(
+                           array("i") for _ in METRIC_COLUMNS
+                       )
+                   )
+
+    @classmethod
+    def from_iter(
+        cls,
+        metrics: Iterable[ComplexityMetrics],
+    ) -> ComplexityMetricsTable:
+        """
+        Build a table from metric objects
+        """
+        table = cls()
+        for item in metrics:
+            table.append(item)
+        return table
+
+    def append(self, metrics: ComplexityMetrics) -> None:
+        """
+        Add one function's metrics as a new row
+        """
+        self.names.append(metrics.name)
+        for column, attr in zip(self.columns, METRIC_COLUMNS, strict = True):
+            column.append(getattr(metrics, attr))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __iter__(self) -> Iterator[ComplexityMetrics]:
+        """
+        Rebuild metric objects row by row
+        """
+        for name, *values in zip(self.names, *self.columns, strict = True):
+            yield ComplexityMetrics(name, *values)
+
+
+@dataclass(slots = True)
 class FileComplexity:
     """
     Aggregated complexity metrics for a file
@@ -100,38 +213,61 @@ class ComplexityAnalyzer:
     """
     Analyzes code complexity using Lizard
     """
-    def __init__(self, language: Language | None = None) -> None:
+    MEMO_SIZE = 4096
+
+    def __init__(
+        self,
+        language: Language | None = None,
+        cache: DiskCache | None = None,
+    ) -> None:
         """
         Initialize analyzer optionally filtered to a language
+        Source results are memoized in memory and, if given, in a disk cache
         """
         self.language = language
+        self.cache = cache
         self._extensions = self._get_extensions()
+        self._memo: dict[str, ComplexityMetricsTable] = {}
 
-    def _get_extensions(self) -> list[str]:
+    def _get_extensions(self) -> tuple[str, ...]:
         """
         Get file extensions for the configured language
         """
-        ext_map = {
-            Language.PYTHON: [".py"],
-            Language.TYPESCRIPT: [".ts"],
-            Language.TSX: [".tsx"],
-            Language.JAVASCRIPT: [".js",
-                                  ".jsx"],
-            Language.GO: [".go"],
-            Language.RUST: [".rs"],
-        }
         if self.language:
-            return ext_map.get(self.language, [])
-        return [ext for exts in ext_map.values() for ext in exts]
+            return EXT_MAP.get(self.language, ())
+        return ALL_EXTS
 
     def analyze_source(self,
                        source: str,
                        filename: str = "source.py") -> list[ComplexityMetrics]:
         """
         Analyze complexity of source code string
+        Results are keyed by a hash of the source and the file extension,
+        which is what lizard uses to pick a language, and stored as tables
         """
-        analysis = lizard.analyze_file.analyze_source_code(filename, source)
-        return self._convert_functions(analysis.function_list)
+        digest = hashlib.blake2b(
+            source.encode("utf-8",
+                          "replace"),
+            digest_size = 16,
+        ).hexdigest()
+        key = f"lizard-table:{digest}:{Path(filename).suffix}"
+
+        results = self._memo.get(key)
+        if results is None and self.cache is not None:
+            results = self.cache.get(key)
+        if results is None:
+            analysis = lizard.analyze_file.analyze_source_code(filename, source)
+            results = ComplexityMetricsTable.from_iter(
+                self._convert_functions(analysis.function_list)
+            )
+            if self.cache is not None:
+                self.cache.set(key, results)
+
+        if key not in self._memo:
+            if len(self._memo) >= self.MEMO_SIZE:
+                del self._memo[next(iter(self._memo))]
+            self._memo[key] = results
+        return list(results)
 
     def analyze_file(self, file_path: Path) -> FileComplexity:
         """
@@ -168,19 +304,16 @@ class ComplexityAnalyzer:
         """
         Analyze all supported files in a directory
         """
-        pattern = "**/*" if recursive else "*"
-        for ext in self._extensions:
-            for file_path in directory.glob(f"{pattern}{ext}"):
-                if file_path.is_file():
-                    try:
-                        yield self.analyze_file(file_path)
-                    except Exception as e:
-                        logger.debug(
-                            "file_analysis_failed",
-                            file = str(file_path),
-                            error = str(e)
-                        )
-                        continue
+        for file_path in _walk(directory, self._extensions, recursive):
+            try:
+                yield self.analyze_file(file_path)
+            except Exception as e:
+                logger.debug(
+                    "file_analysis_failed",
+                    file = str(file_path),
+                    error = str(e)
+                )
+                continue
 
     def _convert_functions(self, function_list: list) -> list[ComplexityMetrics]:
         """
@@ -4,41 +4,56 @@ analysis/parser.py
 """
 from __future__ import annotations
 
+import sys
 import threading
-from dataclasses import dataclass
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import TYPE_CHECKING, ClassVar
+from typing import TYPE_CHECKING, Any, ClassVar
 
 import tree_sitter_go as tsgo
 import tree_sitter_javascript as tsjs
 import tree_sitter_python as tspython
 import tree_sitter_rust as tsrust
 import tree_sitter_typescript as tstypescript
-from tree_sitter import Language, Node, Parser, Tree
+from tree_sitter import Language, Node, Parser, Query, QueryCursor, Tree
 
+from codeworm.analysis.complexity import ComplexityMetrics
 from codeworm.models import Language as CodeLanguage
 
 if TYPE_CHECKING:
     from collections.abc import Iterator
 
 
-@dataclass
+@dataclass(slots = True)
 class ParsedFunction:
     """
     A function or method extracted from parsed source code
+    The body is kept as UTF-8 bytes and decoded on first access to source
     """
     name: str
     start_line: int
     end_line: int
-    source: str
+    source_bytes: bytes
     class_name: str | None = None
     decorators: list[str] | None = None
     parameters: list[str] | None = None
     is_async: bool = False
     docstring: str | None = None
+    complexity: ComplexityMetrics | None = None
+    _source: str | None = field(default = None, repr = False, compare = False)
+
+    @property
+    def source(self) -> str:
+        """
+        Decoded function source
+        """
+        if self._source is None:
+            self._source = self.source_bytes.decode("utf-8", errors = "replace")
+        return self._source
 
 
-@dataclass
+@dataclass(slots = True)
 class ParsedClass:
     """
     A class extracted from parsed source code
@@ -52,15 +67,99 @@ class ParsedClass:
     docstring: str | None = None
 
 
+Point = tuple[int, int]
+TreeEdit = tuple[int, int, int, Point, Point, Point]
+
+EDIT_SCAN_CHUNK = 4096
+
+
+def _common_prefix(old: bytes, new: bytes, limit: int) -> int:
+    """
+    Length of the shared leading bytes, compared a chunk at a time
+    """
+    size = 0
+    while size < limit:
+        step = min(EDIT_SCAN_CHUNK, limit - size)
+        if old[size : size + step] != new[size : size + step]:
+            break
+        size += step
+    while size < limit and old[size] == new[size]:
+        size += 1
+    return size
+
+
+def _common_suffix(old: bytes, new: bytes, limit: int) -> int:
+    """
+    Length of the shared trailing bytes, compared a chunk at a time
+    """
+    old_len, new_len = len(old), len(new)
+    size = 0
+    while size < limit:
+        step = min(EDIT_SCAN_CHUNK, limit - size)
+        if (
+            old[old_len - size - step : old_len - size]
+            != new[new_len - size - step : new_len - size]
+        ):
+            break
+        size += step
+    while size < limit and old[old_len - size - 1] == new[new_len - size - 1]:
+        size += 1
+    return size
+
+
+def _point_after(start: Point, text: bytes) -> Point:
+    """
+    Row and byte column reached after text that begins at start
+    """
+    rows = text.count(b"\n")
+    if not rows:
+        return (start[0], start[1] + len(text))
+    return (start[0] + rows, len(text) - text.rfind(b"\n") - 1)
+
+
+def source_edit(old: bytes, new: bytes) -> TreeEdit:
+    """
+    Single tree edit covering everything between the shared prefix and suffix
+    """
+    limit = min(len(old), len(new))
+    start = _common_prefix(old, new, limit)
+    tail = _common_suffix(old, new, limit - start)
+    old_end = len(old) - tail
+    new_end = len(new) - tail
+
+    start_point = (
+        old.count(b"\n", 0, start),
+        start - old.rfind(b"\n", 0, start) - 1,
+    )
+    return (
+        start,
+        old_end,
+        new_end,
+        start_point,
+        _point_after(start_point, old[start : old_end]),
+        _point_after(start_point, new[start : new_end]),
+    )
+
+
 class ParserManager:
     """
     Thread-safe tree-sitter parser management
     Parsers are not thread-safe so we use thread-local storage
     """
     _languages: ClassVar[dict[CodeLanguage, Language]] = {}
+    _queries: ClassVar[dict[tuple[CodeLanguage, str], Query]] = {}
     _local = threading.local()
     _initialized = False
 
+    TREE_CACHE_MAX_ENTRIES = 64
+    TREE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+    TREE_BYTES_PER_SOURCE_BYTE = 24
+    _trees: ClassVar[OrderedDict[str, tuple[bytes, CodeLanguage, Tree]]] = (
+        OrderedDict()
+    )
+    _trees_bytes = 0
+    _trees_lock = threading.Lock()
+
     @classmethod
     def initialize(cls) -> None:
         """
@@ -96,6 +195,24 @@ class ParserManager:
 
         return cls._local.parsers[language]
 
+    @classmethod
+    def get_query(cls, language: CodeLanguage, name: str) -> Query | None:
+        """
+        Get the compiled extraction query for a language, built once
+        Compiled queries are immutable so they are shared across threads
+        """
+        key = (language, name)
+        query = cls._queries.get(key)
+        if query is None:
+            pattern = EXTRACTION_QUERIES.get(language, {}).get(name)
+            if pattern is None:
+                return None
+            if not cls._initialized:
+                cls.initialize()
+            query = Query(cls._languages[language], pattern)
+            cls._queries[key] = query
+        return query
+
     @classmethod
     def parse(cls, source: str | bytes, language: CodeLanguage) -> Tree:
         """
@@ -106,6 +223,79 @@ class ParserManager:
             source = source.encode("utf-8")
         return parser.parse(source)
 
+    @classmethod
+    def reparse(
+        cls,
+        old_tree: Tree,
+        edits: list[TreeEdit],
+        source: bytes,
+        language: CodeLanguage,
+    ) -> Tree:
+        """
+        Incrementally parse new source against a tree of the old source
+        The old tree is copied before the edits are applied to it
+        """
+        tree = old_tree.copy()
+        for edit in edits:
+            tree.edit(*edit)
+        return cls.get_parser(language).parse(source, tree)
+
+    @classmethod
+    def parse_cached(
+        cls,
+        key: str,
+        source: bytes,
+        language: CodeLanguage,
+    ) -> Tree:
+        """
+        Parse source, reusing the last tree stored under key when present
+        The changed span is found by diffing against the cached source
+        Sources are referenced rather than copied, and the budget counts
+        an estimate of the tree alongside the source
+        """
+        with cls._trees_lock:
+            cached = cls._trees.pop(key, None)
+            if cached is not None:
+                cls._trees_bytes -= cls._tree_cost(cached[0])
+
+        if cached is None or cached[1] != language:
+            tree = cls.get_parser(language).parse(source)
+        else:
+            edit = source_edit(cached[0], source)
+            if edit[0] == edit[1] == edit[2]:
+                tree = cached[2]
+            else:
+                tree = cls.reparse(cached[2], [edit], source, language)
+
+        cost = cls._tree_cost(source)
+        if cost <= cls.TREE_CACHE_MAX_BYTES // 4:
+            with cls._trees_lock:
+                cls._trees[key] = (source, language, tree)
+                cls._trees_bytes += cost
+                while (
+                    cls._trees_bytes > cls.TREE_CACHE_MAX_BYTES
+                    or len(cls._trees) > cls.TREE_CACHE_MAX_ENTRIES
+                ):
+                    _, (old_source, _, _) = cls._trees.popitem(last = False)
+                    cls._trees_bytes -= cls._tree_cost(old_source)
+        return tree
+
+    @classmethod
+    def _tree_cost(cls, source: bytes) -> int:
+        """
+        Estimated memory held by a cached source and its syntax tree
+        """
+        return len(source) * (1 + cls.TREE_BYTES_PER_SOURCE_BYTE)
+
+    @classmethod
+    def clear_tree_cache(cls) -> None:
+        """
+        Drop every cached tree
+        """
+        with cls._trees_lock:
+            cls._trees.clear()
+            cls._trees_bytes = 0
+
 
 PYTHON_QUERIES = {
     "function":
@@ -130,24 +320,212 @@ PYTHON_QUERIES = {
 }
 
 
+_JS_BRANCH_TOKENS = dict.fromkeys(
+    ("if",
+     "for",
+     "while",
+     "catch",
+     "case",
+     "&&",
+     "||",
+     "?"),
+    1,
+)
+_JS_FUNCTION_NODES = frozenset(
+    {
+        "function_declaration",
+        "function_expression",
+        "generator_function_declaration",
+        "arrow_function",
+        "method_definition",
+    }
+)
+
+BRANCH_TOKENS: dict[CodeLanguage,
+                    dict[str,
+                         int]] = {
+                             CodeLanguage.PYTHON: dict.fromkeys(
+                                 (
+                                     "if",
+                                     "elif",
+                                     "for",
+                                     "while",
+                                     "except",
+                                     "finally",
+                                     "and",
+                                     "or",
+                                 ),
+                                 1,
+                             ),
+                             CodeLanguage.TYPESCRIPT: _JS_BRANCH_TOKENS,
+                             CodeLanguage.TSX: _JS_BRANCH_TOKENS,
+                             CodeLanguage.JAVASCRIPT: _JS_BRANCH_TOKENS,
+                             CodeLanguage.GO: dict.fromkeys(
+                                 ("if",
+                                  "for",
+                                  "case",
+                                  "&&",
+                                  "||"),
+                                 1,
+                             ),
+                             # lizard counts every match arm after the first
+                             CodeLanguage.RUST: {
+                                 **dict.fromkeys(
+                                     (
+                                         "if",
+                                         "for",
+                                         "while",
+                                         "where",
+                                         "&&",
+                                         "||",
+                                         "?",
+                                         "=>",
+                                     ),
+                                     1,
+                                 ),
+                                 "match": -1,
+                             },
+                         }
+
+FUNCTION_NODES: dict[CodeLanguage,
+                     frozenset[str]] = {
+                         CodeLanguage.PYTHON: frozenset({"function_definition"}),
+                         CodeLanguage.TYPESCRIPT: _JS_FUNCTION_NODES,
+                         CodeLanguage.TSX: _JS_FUNCTION_NODES,
+                         CodeLanguage.JAVASCRIPT: _JS_FUNCTION_NODES,
+                         CodeLanguage.GO: frozenset(
+                             {
+                                 "function_declaration",
+                                 "method_declaration",
+                                 "func_literal",
+                             }
+                         ),
+                         CodeLanguage.RUST: frozenset(
+                             {"function_item",
+                              "closure_expression"}
+                         ),
+                     }
+
+PYTHON_FUNCTION_TYPES = frozenset({"function_definition"})
+PYTHON_CLASS_TYPES = frozenset({"class_definition"})
+JS_FUNCTION_TYPES = frozenset(
+    {
+        "function_declaration",
+        "method_definition",
+        "arrow_function",
+    }
+)
+JS_CLASS_TYPES = frozenset({"class_declaration", "class"})
+GO_FUNCTION_TYPES = frozenset({"function_declaration", "method_declaration"})
+RUST_FUNCTION_TYPES = frozenset({"function_item"})
+RUST_IMPL_TYPES = frozenset({"impl_item"})
+
+
+def _alternation(node_types: frozenset[str]) -> str:
+    """
+    Query pattern matching any of the given node types
+    """
+    return "[" + " ".join(f"({t})" for t in sorted(node_types)) + "]"
+
+
+_JS_QUERIES = {"function": f"{_alternation(JS_FUNCTION_TYPES)} @function"}
+
+EXTRACTION_QUERIES: dict[CodeLanguage,
+                         dict[str,
+                              str]] = {
+                                  CodeLanguage.PYTHON: {
+                                      "function":
+                                      f"{_alternation(PYTHON_FUNCTION_TYPES)} @function",
+                                      "class":
+                                      f"{_alternation(PYTHON_CLASS_TYPES)} @class",
+                                  },
+                                  CodeLanguage.TYPESCRIPT: _JS_QUERIES,
+                                  CodeLanguage.TSX: _JS_QUERIES,
+                                  CodeLanguage.JAVASCRIPT: _JS_QUERIES,
+                                  CodeLanguage.GO: {
+                                      "function":
+                                      f"{_alternation(GO_FUNCTION_TYPES)} @function",
+                                  },
+                                  CodeLanguage.RUST: {
+                                      "function":
+                                      f"{_alternation(RUST_FUNCTION_TYPES)} @function",
+                                  },
+                              }
+
+SEPARATOR_NODES = frozenset({"keyword_separator", "positional_separator"})
+COMMENT_NODES = frozenset({"comment", "line_comment", "block_comment"})
+STRING_PREFIX_CHARS = b"rRuUbBfF"
+STRING_QUOTES = (b'"""', b"'''", b'"', b"'")
+
+
 class CodeExtractor:
     """
     Extracts functions and classes from parsed syntax trees
     """
-    def __init__(self, source: str, language: CodeLanguage) -> None:
+    def __init__(
+        self,
+        source: str | bytes,
+        language: CodeLanguage,
+        measure_complexity: bool = False,
+        cache_key: str | None = None,
+    ) -> None:
         """
         Initialize extractor with source code and language
+        Bytes are parsed as-is and only decoded when needed
+        With measure_complexity each extracted function also carries
+        ComplexityMetrics computed from the same syntax tree
+        With cache_key the previous tree for that key is reparsed incrementally
         """
-        self.source = source
-        self.source_bytes = source.encode("utf-8")
+        self._source: str | None
+        if isinstance(source, str):
+            self._source = source
+            self.source_bytes = source.encode("utf-8")
+        else:
+            self._source = None
+            self.source_bytes = source
         self.language = language
-        self.tree = ParserManager.parse(source, language)
+        self.measure_complexity = (
+            measure_complexity and language in BRANCH_TOKENS
+        )
+        if cache_key is not None:
+            self.tree: Tree | None = ParserManager.parse_cached(
+                cache_key,
+                self.source_bytes,
+                language,
+            )
+        else:
+            self.tree = ParserManager.get_parser(language).parse(
+                self.source_bytes
+            )
+        self._functions: list[ParsedFunction] | None = None
+
+    @property
+    def source(self) -> str:
+        """
+        Decoded source text, built on first access
+        """
+        if self._source is None:
+            self._source = str(
+                self.source_bytes,
+                encoding = "utf-8",
+                errors = "replace"
+            )
+        return self._source
+
+    def close(self) -> None:
+        """
+        Drop the syntax tree so its memory is freed before the next parse
+        """
+        self.tree = None
 
     def _node_text(self, node: Node) -> str:
         """
         Get the text content of a node
         """
-        return self.source_bytes[node.start_byte : node.end_byte].decode("utf-8")
+        return self.source_bytes[node.start_byte : node.end_byte].decode(
+            "utf-8",
+            errors = "replace"
+        )
 
     def _get_docstring(self, node: Node) -> str | None:
         """
@@ -169,15 +547,131 @@ class CodeExtractor:
         if first_stmt.type == "expression_statement":
             expr = first_stmt.children[0] if first_stmt.children else None
             if expr and expr.type == "string":
-                text = self._node_text(expr)
-                text = text.strip('"').strip("'")
-                return text
+                raw = self.source_bytes[expr.start_byte : expr.end_byte]
+                raw = raw.lstrip(STRING_PREFIX_CHARS)
+                for quote in STRING_QUOTES:
+                    width = len(quote)
+                    if (
+                        len(raw) >= width * 2 and raw.startswith(quote)
+                        and raw.endswith(quote)
+                    ):
+                        raw = raw[width : -width]
+                        break
+                return raw.decode("utf-8", errors = "replace")
 
         return None
 
+    def _make_function(self, node: Node, **fields: Any) -> ParsedFunction:
+        """
+        Build a ParsedFunction for a node, measuring it when enabled
+        """
+        func = ParsedFunction(
+            start_line = node.start_point[0] + 1,
+            end_line = node.end_point[0] + 1,
+            source_bytes = self.source_bytes[node.start_byte : node.end_byte],
+            **fields,
+        )
+        if self.measure_complexity:
+            func.complexity = self._measure(node, func)
+        return func
+
+    def _measure(self, node: Node, func: ParsedFunction) -> ComplexityMetrics:
+        """
+        Compute lizard-style metrics from the function's syntax tree
+        Branches are the keyword and operator tokens lizard counts, and a
+        nested function's header line stays in the enclosing function
+        Walks with a TreeCursor so no child lists are built per node
+        Nested functions are skipped as lizard reports them separately
+        """
+        branches = BRANCH_TOKENS[self.language]
+        functions = FUNCTION_NODES[self.language]
+
+        cyclomatic = 1
+        token_count = 0
+        code_lines: set[int] = set()
+        docstring_span = self._docstring_span(node)
+
+        cursor = node.walk()
+        depth = 0
+        walking = cursor.goto_first_child()
+
+        while walking:
+            current = cursor.node
+            if current is None:
+                break
+            node_type = current.type
+
+            if node_type in functions:
+                code_lines.add(current.start_point[0])
+            elif (current.start_byte, current.end_byte) != docstring_span:
+                if current.child_count == 0:
+                    cyclomatic += branches.get(node_type, 0)
+                    if node_type not in COMMENT_NODES:
+                        token_count += 1
+                        code_lines.update(
+                            range(current.start_point[0],
+                                  current.end_point[0] + 1)
+                        )
+                elif cursor.goto_first_child():
+                    depth += 1
+                    continue
+
+            while not cursor.goto_next_sibling():
+                if not depth:
+                    walking = False
+                    break
+                cursor.goto_parent()
+                depth -= 1
+
+        params_node = node.child_by_field_name("parameters")
+        if params_node is not None:
+            parameter_count = sum(
+                1 for child in params_node.named_children
+                if child.type not in COMMENT_NODES
+                and child.type not in SEPARATOR_NODES
+            )
+        else:
+            parameter_count = int(
+                node.child_by_field_name("parameter") is not None
+            )
+
+        return ComplexityMetrics(
+            name = func.name,
+            cyclomatic_complexity = cyclomatic,
+            nloc = len(code_lines),
+            token_count = token_count,
+            parameter_count = parameter_count,
+            start_line = func.start_line,
+            end_line = func.end_line,
+        )
+
+    def _docstring_span(self, node: Node) -> tuple[int, int] | None:
+        """
+        Byte span of a Python docstring statement, which lizard does not count
+        """
+        if self.language != CodeLanguage.PYTHON:
+            return None
+        body = node.child_by_field_name("body")
+        if body is None or not body.named_children:
+            return None
+        first = body.named_children[0]
+        if (first.type == "expression_statement" and first.named_children
+                and first.named_children[0].type == "string"):
+            return (first.start_byte, first.end_byte)
+        return None
+
     def extract_functions(self) -> Iterator[ParsedFunction]:
         """
         Extract all functions from the source code
+        The result is memoized so extract_classes can reuse it
+        """
+        if self._functions is None:
+            self._functions = list(self._iter_functions())
+        yield from self._functions
+
+    def _iter_functions(self) -> Iterator[ParsedFunction]:
+        """
+        Dispatch to the language specific function extractor
         """
         if self.language == CodeLanguage.PYTHON:
             yield from self._extract_python_functions()
@@ -190,173 +684,157 @@ class CodeExtractor:
         elif self.language == CodeLanguage.RUST:
             yield from self._extract_rust_functions()
 
+    def _query_nodes(self, capture: str) -> list[Node]:
+        """
+        Nodes matched by the language's query for a capture, in source order
+        """
+        query = ParserManager.get_query(self.language, capture)
+        if query is None or self.tree is None:
+            return []
+        captures = QueryCursor(query).captures(self.tree.root_node)
+        return sorted(captures.get(capture, []), key = lambda n: n.start_byte)
+
+    def _top_level_container(
+        self,
+        node: Node,
+        stop_types: frozenset[str],
+        container_types: frozenset[str] = frozenset(),
+    ) -> tuple[bool,
+               Node | None]:
+        """
+        Walk up from node, reporting whether it is nested inside a stop type
+        and the nearest enclosing container such as a class or impl block
+        """
+        container = None
+        parent = node.parent
+        while parent is not None:
+            if parent.type in stop_types:
+                return False, None
+            if container is None and parent.type in container_types:
+                container = parent
+            parent = parent.parent
+        return True, container
+
+    def _field_text(self, node: Node | None, field_name: str) -> str | None:
+        """
+        Interned text of a node's named field if both exist
+        Fields read here are identifiers that repeat across files
+        """
+        if node is None:
+            return None
+        child = node.child_by_field_name(field_name)
+        return sys.intern(self._node_text(child)) if child else None
+
     def _extract_python_functions(self) -> Iterator[ParsedFunction]:
         """
         Extract functions from Python source
+        Functions nested inside other functions are skipped
         """
-        def visit(node: Node,
-                  class_name: str | None = None) -> Iterator[ParsedFunction]:
-            if node.type == "class_definition":
-                name_node = node.child_by_field_name("name")
-                if name_node:
-                    current_class = self._node_text(name_node)
-                    for child in node.children:
-                        yield from visit(child, current_class)
-                return
-
-            if node.type == "function_definition":
-                name_node = node.child_by_field_name("name")
-                params_node = node.child_by_field_name("parameters")
-
-                if name_node:
-                    name = self._node_text(name_node)
-                    params = []
-                    if params_node:
-                        for param in params_node.children:
-                            if param.type in ("identifier",
-                                              "typed_parameter",
-                                              "default_parameter"):
-                                params.append(self._node_text(param))
-
-                    yield ParsedFunction(
-                        name = name,
-                        start_line = node.start_point[0] + 1,
-                        end_line = node.end_point[0] + 1,
-                        source = self._node_text(node),
-                        class_name = class_name,
-                        parameters = params,
-                        docstring = self._get_docstring(node),
-                    )
-                return
-
-            if node.type == "decorated_definition":
-                decorators = []
-                func_node = None
-                for child in node.children:
-                    if child.type == "decorator":
-                        decorators.append(self._node_text(child))
-                    elif child.type == "function_definition":
-                        func_node = child
-
-                if func_node:
-                    for func in visit(func_node, class_name):
-                        func.decorators = decorators
-                        yield func
-                return
-
-            for child in node.children:
-                yield from visit(child, class_name)
-
-        yield from visit(self.tree.root_node)
+        for node in self._query_nodes("function"):
+            top_level, class_node = self._top_level_container(
+                node,
+                PYTHON_FUNCTION_TYPES,
+                PYTHON_CLASS_TYPES,
+            )
+            if not top_level:
+                continue
+
+            name = self._field_text(node, "name")
+            if not name:
+                continue
+
+            params = []
+            params_node = node.child_by_field_name("parameters")
+            if params_node:
+                for param in params_node.children:
+                    if param.type in ("identifier",
+                                      "typed_parameter",
+                                      "default_parameter"):
+                        params.append(sys.intern(self._node_text(param)))
+
+            decorators = None
+            parent = node.parent
+            if parent is not None and parent.type == "decorated_definition":
+                decorators = [
+                    self._node_text(child)
+                    for child in parent.children if child.type == "decorator"
+                ]
+
+            yield self._make_function(
+                node,
+                name = name,
+                class_name = self._field_text(class_node, "name"),
+                decorators = decorators,
+                parameters = params,
+                docstring = self._get_docstring(node),
+            )
 
     def _extract_js_functions(self) -> Iterator[ParsedFunction]:
         """
         Extract functions from JavaScript/TypeScript source
         """
-        def visit(node: Node,
-                  class_name: str | None = None) -> Iterator[ParsedFunction]:
-            if node.type in ("class_declaration", "class"):
-                name_node = node.child_by_field_name("name")
-                current_class = self._node_text(name_node) if name_node else None
-                for child in node.children:
-                    yield from visit(child, current_class)
-                return
-
-            if node.type in ("function_declaration",
-                             "method_definition",
-                             "arrow_function"):
-                name_node = node.child_by_field_name("name")
-                name = self._node_text(name_node) if name_node else "<anonymous>"
-
-                is_async = any(c.type == "async" for c in node.children)
-
-                yield ParsedFunction(
-                    name = name,
-                    start_line = node.start_point[0] + 1,
-                    end_line = node.end_point[0] + 1,
-                    source = self._node_text(node),
-                    class_name = class_name,
-                    is_async = is_async,
-                )
-                return
-
-            for child in node.children:
-                yield from visit(child, class_name)
-
-        yield from visit(self.tree.root_node)
+        for node in self._query_nodes("function"):
+            top_level, class_node = self._top_level_container(
+                node,
+                JS_FUNCTION_TYPES,
+                JS_CLASS_TYPES,
+            )
+            if not top_level:
+                continue
+
+            yield self._make_function(
+                node,
+                name = self._field_text(node, "name") or "<anonymous>",
+                class_name = self._field_text(class_node, "name"),
+                is_async = any(c.type == "async" for c in node.children),
+            )
 
     def _extract_go_functions(self) -> Iterator[ParsedFunction]:
         """
         Extract functions from Go source
         """
-        def visit(node: Node) -> Iterator[ParsedFunction]:
-            if node.type == "function_declaration":
-                name_node = node.child_by_field_name("name")
-                if name_node:
-                    yield ParsedFunction(
-                        name = self._node_text(name_node),
-                        start_line = node.start_point[0] + 1,
-                        end_line = node.end_point[0] + 1,
-                        source = self._node_text(node),
-                    )
-                return
-
-            if node.type == "method_declaration":
-                name_node = node.child_by_field_name("name")
-                receiver = node.child_by_field_name("receiver")
-                class_name = None
-                if receiver:
-                    for child in receiver.children:
-                        if child.type == "type_identifier":
-                            class_name = self._node_text(child)
-                            break
-
-                if name_node:
-                    yield ParsedFunction(
-                        name = self._node_text(name_node),
-                        start_line = node.start_point[0] + 1,
-                        end_line = node.end_point[0] + 1,
-                        source = self._node_text(node),
-                        class_name = class_name,
-                    )
-                return
-
-            for child in node.children:
-                yield from visit(child)
-
-        yield from visit(self.tree.root_node)
+        for node in self._query_nodes("function"):
+            name = self._field_text(node, "name")
+            if not name:
+                continue
+
+            class_name = None
+            receiver = node.child_by_field_name("receiver")
+            if receiver:
+                for child in receiver.children:
+                    if child.type == "type_identifier":
+                        class_name = sys.intern(self._node_text(child))
+                        break
+
+            yield self._make_function(
+                node,
+                name = name,
+                class_name = class_name,
+            )
 
     def _extract_rust_functions(self) -> Iterator[ParsedFunction]:
         """
         Extract functions from Rust source
         """
-        def visit(node: Node,
-                  impl_name: str | None = None) -> Iterator[ParsedFunction]:
-            if node.type == "impl_item":
-                type_node = node.child_by_field_name("type")
-                current_impl = self._node_text(type_node) if type_node else None
-                for child in node.children:
-                    yield from visit(child, current_impl)
-                return
-
-            if node.type == "function_item":
-                name_node = node.child_by_field_name("name")
-                if name_node:
-                    is_async = any(c.type == "async" for c in node.children)
-                    yield ParsedFunction(
-                        name = self._node_text(name_node),
-                        start_line = node.start_point[0] + 1,
-                        end_line = node.end_point[0] + 1,
-                        source = self._node_text(node),
-                        class_name = impl_name,
-                        is_async = is_async,
-                    )
-                return
-
-            for child in node.children:
-                yield from visit(child, impl_name)
-
-        yield from visit(self.tree.root_node)
+        for node in self._query_nodes("function"):
+            top_level, impl_node = self._top_level_container(
+                node,
+                RUST_FUNCTION_TYPES,
+                RUST_IMPL_TYPES,
+            )
+            if not top_level:
+                continue
+
+            name = self._field_text(node, "name")
+            if not name:
+                continue
+
+            yield self._make_function(
+                node,
+                name = name,
+                class_name = self._field_text(impl_node, "type"),
+                is_async = any(c.type == "async" for c in node.children),
+            )
 
     def extract_classes(self) -> Iterator[ParsedClass]:
         """
@@ -368,34 +846,68 @@ class CodeExtractor:
     def _extract_python_classes(self) -> Iterator[ParsedClass]:
         """
         Extract classes from Python source
+        Classes nested inside other classes are skipped
         """
-        def visit(node: Node) -> Iterator[ParsedClass]:
-            if node.type == "class_definition":
-                name_node = node.child_by_field_name("name")
-                if name_node:
-                    name = self._node_text(name_node)
-                    methods = list(self._extract_python_functions())
-                    class_methods = [m for m in methods if m.class_name == name]
-
-                    yield ParsedClass(
-                        name = name,
-                        start_line = node.start_point[0] + 1,
-                        end_line = node.end_point[0] + 1,
-                        source = self._node_text(node),
-                        methods = class_methods,
-                        docstring = self._get_docstring(node),
-                    )
-                return
-
-            for child in node.children:
-                yield from visit(child)
-
-        yield from visit(self.tree.root_node)
-
-
-def parse_file(file_path: Path, language: CodeLanguage) -> CodeExtractor:
+        methods_by_class: dict[str, list[ParsedFunction]] | None = None
+
+        for node in self._query_nodes("class"):
+            top_level, _ = self._top_level_container(node, PYTHON_CLASS_TYPES)
+            if not top_level:
+                continue
+
+            name = self._field_text(node, "name")
+            if not name:
+                continue
+
+            if methods_by_class is None:
+                methods_by_class = {}
+                for func in self.extract_functions():
+                    if func.class_name:
+                        methods_by_class.setdefault(func.class_name,
+                                                    []).append(func)
+
+            yield ParsedClass(
+                name = name,
+                start_line = node.start_point[0] + 1,
+                end_line = node.end_point[0] + 1,
+                source = self._node_text(node),
+                methods = list(methods_by_class.get(name, [])),
+                docstring = self._get_docstring(node),
+            )
+
+
+def parse_file(
+    file_path: Path,
+    language: CodeLanguage,
+    measure_complexity: bool = False,
+    incremental: bool = False,
+) -> CodeExtractor:
     """
     Parse a file and return an extractor for it
+    With incremental the tree from the last parse of this path is reused
+    """
+    return CodeExtractor(
+        file_path.read_bytes(),
+        language,
+        measure_complexity,
+        cache_key = str(file_path) if incremental else None,
+    )
+
+
+def extract_file(
+    file_path: Path,
+    language: CodeLanguage,
+) -> tuple[list[ParsedFunction],
+           list[ParsedClass]]:
+    """
+    Parse a file and return its functions and classes
+    Module level so process pools can pickle it
     """
-    source = file_path.read_text(encoding = "utf-8")
-    return CodeExtractor(source, language)
+    extractor = parse_file(file_path, language)
+    try:
+        return (
+            list(extractor.extract_functions()),
+            list(extractor.extract_classes()),
+        )
+    finally:
+        extractor.close()
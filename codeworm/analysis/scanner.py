@@ -4,24 +4,84 @@ analysis/scanner.py
 """
 from __future__ import annotations
 
+import functools
+import itertools
+import multiprocessing
 import os
 import random
+import re
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import TYPE_CHECKING, ClassVar
 
 import pathspec
+from pathspec.util import NORMALIZE_PATH_SEPS
 from git import InvalidGitRepositoryError, Repo
 
-from codeworm.models import LANGUAGE_EXTENSIONS, Language
+from codeworm.analysis.parser import (
+    ParsedClass,
+    ParsedFunction,
+    ParserManager,
+    extract_file,
+)
+from codeworm.models import Language, language_for_filename
 
 if TYPE_CHECKING:
-    from collections.abc import Iterator
+    from collections.abc import Callable, Iterator
 
     from codeworm.core.config import RepoEntry
 
 
-@dataclass
+TEXT_BYTES = bytes(range(32, 127)) + b"\t\n\r"
+
+
+def nontext_ratio(chunk: bytes) -> float:
+    """
+    Fraction of bytes outside printable ASCII and common whitespace
+    bytes.translate deletes the text bytes in C so no Python loop runs
+    """
+    if not chunk:
+        return 0.0
+    return len(chunk.translate(None, TEXT_BYTES)) / len(chunk)
+
+
+def compile_matcher(spec: pathspec.PathSpec) -> Callable[[str], bool]:
+    """
+    Fold a spec of plain include patterns into a single regex alternation
+    Specs with negations fall back to match_file since pattern order matters
+    """
+    regexes: list[str] = []
+    for pattern in spec.patterns:
+        if pattern.include is None:
+            continue
+        regex = getattr(pattern, "regex", None)
+        if (pattern.include is False or regex is None
+                or not isinstance(regex.pattern, str)):
+            return spec.match_file
+        regexes.append(regex.pattern.replace("(?P<ps_d>", "(?:"))
+
+    if not regexes or NORMALIZE_PATH_SEPS:
+        return spec.match_file
+
+    try:
+        combined = re.compile("|".join(f"(?:{regex})" for regex in regexes))
+    except re.error:
+        return spec.match_file
+
+    def match(path: str) -> bool:
+        return combined.match(path) is not None
+
+    return match
+
+
+PARALLEL_PARSE_MIN_FILES = 32
+PARSE_CHUNK_SIZE = 32
+
+
+@dataclass(slots = True)
 class ScannedFile:
     """
     A file discovered during repository scanning
@@ -38,7 +98,7 @@ class ScannedFile:
         return self.path.suffix.lower()
 
 
-@dataclass
+@dataclass(slots = True)
 class RepoStats:
     """
     Statistics about a scanned repository
@@ -88,6 +148,7 @@ class GitignoreFilter:
         )
 
         self.spec = pathspec.PathSpec.from_lines("gitwildmatch", patterns)
+        self._match = compile_matcher(self.spec)
 
     def is_ignored(self, path: Path) -> bool:
         """
@@ -99,6 +160,12 @@ class GitignoreFilter:
         except ValueError:
             return False
 
+    def is_ignored_relative(self, rel_path: str) -> bool:
+        """
+        Check a path already made relative to the repo root
+        """
+        return self._match(rel_path)
+
 
 class RepoScanner:
     """
@@ -124,6 +191,20 @@ class RepoScanner:
     MAX_FILE_SIZE = 1024 * 1024
     BINARY_CHECK_BYTES = 8192
 
+    PRUNE_DIR_NAMES: ClassVar[frozenset[str]] = frozenset(
+        {
+            "node_modules",
+            "vendor",
+            "dist",
+            "build",
+            "tests",
+            "test",
+            "__tests__",
+            "__pycache__",
+            "venv",
+        }
+    )
+
     def __init__(
         self,
         include_patterns: list[str] | None = None,
@@ -144,72 +225,158 @@ class RepoScanner:
             "gitwildmatch",
             self.exclude_patterns
         )
+        self._include_spec = pathspec.PathSpec.from_lines(
+            "gitwildmatch",
+            self.include_patterns
+        )
+        self._exclude_match = compile_matcher(self._exclude_spec)
+        self._include_match = compile_matcher(self._include_spec)
+        self._prune_excluded_dirs = all(
+            pattern.include is not False
+            for pattern in self._exclude_spec.patterns
+        )
+        self._pruned_dir_names = frozenset(
+            name for name in self.PRUNE_DIR_NAMES
+            if self._prune_excluded_dirs
+            and self._exclude_spec.match_file(f"{name}/")
+            and self._exclude_spec.match_file(f"_/{name}/")
+        )
+        self._gitignore_filters: dict[Path,
+                                      tuple[int | None,
+                                            GitignoreFilter]] = {}
+
+    def _get_gitignore_filter(self, repo_path: Path) -> GitignoreFilter:
+        """
+        Get the gitignore filter for a repo, rebuilt only when .gitignore changes
+        """
+        try:
+            mtime = (repo_path / ".gitignore").stat().st_mtime_ns
+        except OSError:
+            mtime = None
 
-    def scan_repo(self, repo_path: Path, repo_name: str) -> Iterator[ScannedFile]:
+        cached = self._gitignore_filters.get(repo_path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        gitignore_filter = GitignoreFilter(repo_path)
+        self._gitignore_filters[repo_path] = (mtime, gitignore_filter)
+        return gitignore_filter
+
+    def scan_repo(
+        self,
+        repo_path: Path,
+        repo_name: str,
+        stats: RepoStats | None = None,
+    ) -> Iterator[ScannedFile]:
         """
         Scan a repository and yield discovered files
+        When stats is given it is updated with each yielded file
         """
         if not repo_path.exists():
             return
 
-        gitignore_filter = GitignoreFilter(repo_path)
-        include_spec = pathspec.PathSpec.from_lines(
-            "gitwildmatch",
-            self.include_patterns
-        )
+        repo_name = sys.intern(repo_name)
+        gitignore_filter = self._get_gitignore_filter(repo_path)
+        include_match = self._include_match
+        exclude_match = self._exclude_match
 
-        for root, dirs, files in os.walk(repo_path):
-            root_path = Path(root)
+        for entry, rel_str in self._walk(repo_path, gitignore_filter):
+            language = language_for_filename(entry.name)
+            if not language:
+                continue
 
-            dirs[:] = [
-                d for d in dirs if not d.startswith(".")
-                and not gitignore_filter.is_ignored(root_path / d)
-            ]
+            if entry.name.rpartition(".")[0].endswith(".min"):
+                continue
 
-            for filename in files:
-                file_path = root_path / filename
+            if not include_match(rel_str):
+                continue
 
-                try:
-                    rel_path = file_path.relative_to(repo_path)
-                except ValueError:
-                    continue
+            if exclude_match(rel_str):
+                continue
 
-                if not include_spec.match_file(str(rel_path)):
-                    continue
+            if gitignore_filter.is_ignored_relative(rel_str):
+                continue
 
-                if self._exclude_spec.match_file(str(rel_path)):
+            try:
+                stat = entry.stat()
+                if stat.st_size > self.MAX_FILE_SIZE:
                     continue
-
-                if gitignore_filter.is_ignored(file_path):
+                if stat.st_size == 0:
                     continue
 
-                ext = file_path.suffix.lower()
-                language = LANGUAGE_EXTENSIONS.get(ext)
-                if not language:
+                file_path = Path(entry.path)
+                is_binary = self._is_binary(file_path)
+                if is_binary:
                     continue
 
-                try:
-                    stat = file_path.stat()
-                    if stat.st_size > self.MAX_FILE_SIZE:
-                        continue
-                    if stat.st_size == 0:
-                        continue
-
-                    is_binary = self._is_binary(file_path)
-                    if is_binary:
-                        continue
-
-                    yield ScannedFile(
-                        path = file_path,
-                        language = language,
-                        repo_name = repo_name,
-                        relative_path = rel_path,
-                        size_bytes = stat.st_size,
-                        is_binary = False,
+                if stats is not None:
+                    stats.total_files += 1
+                    stats.total_size_bytes += stat.st_size
+                    stats.files_by_language[language] = (
+                        stats.files_by_language.get(language,
+                                                    0) + 1
                     )
 
-                except (OSError, PermissionError):
-                    continue
+                yield ScannedFile(
+                    path = file_path,
+                    language = language,
+                    repo_name = repo_name,
+                    relative_path = Path(rel_str),
+                    size_bytes = stat.st_size,
+                    is_binary = False,
+                )
+
+            except (OSError, PermissionError):
+                continue
+
+    def _walk(
+        self,
+        repo_path: Path,
+        gitignore_filter: GitignoreFilter,
+    ) -> Iterator[tuple[os.DirEntry[str],
+                        str]]:
+        """
+        Walk a repo top-down with scandir, yielding file entries and their
+        repo-relative paths
+        Hidden, gitignored and excluded directories are pruned and directory
+        symlinks are not followed, matching os.walk defaults
+        """
+        prefix_len = len(str(repo_path)) + 1
+        stack = [str(repo_path)]
+        pruned_names = self._pruned_dir_names
+        exclude_match = (
+            self._exclude_match if self._prune_excluded_dirs else None
+        )
+
+        while stack:
+            directory = stack.pop()
+            subdirs: list[str] = []
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        rel_str = entry.path[prefix_len :]
+                        try:
+                            is_dir = entry.is_dir()
+                        except OSError:
+                            is_dir = False
+
+                        if not is_dir:
+                            yield entry, rel_str
+                            continue
+
+                        name = entry.name
+                        if (name.startswith(".") or name in pruned_names
+                                or entry.is_symlink()
+                                or gitignore_filter.is_ignored_relative(rel_str)):
+                            continue
+                        if exclude_match is not None and exclude_match(
+                                f"{rel_str}/"):
+                            continue
+                        subdirs.append(entry.path)
+            except OSError:
+                continue
+
+            stack.extend(reversed(subdirs))
 
     def _is_binary(self, file_path: Path) -> bool:
         """
@@ -220,10 +387,7 @@ class RepoScanner:
                 chunk = f.read(self.BINARY_CHECK_BYTES)
                 if b"\x00" in chunk:
                     return True
-                text_chars = sum(
-                    1 for b in chunk if 32 <= b <= 126 or b in (9, 10, 13)
-                )
-                return text_chars / len(chunk) < 0.7 if chunk else False
+                return nontext_ratio(chunk) > 0.3
         except Exception:
             return True
 
@@ -234,24 +398,48 @@ class RepoScanner:
         stats = RepoStats(name = repo_name, path = repo_path)
 
         try:
-            git_repo = Repo(repo_path)
+            stats.branch = _active_branch(str(repo_path))
             stats.is_git_repo = True
-            stats.branch = git_repo.active_branch.name
         except InvalidGitRepositoryError:
             stats.is_git_repo = False
 
-        for scanned_file in self.scan_repo(repo_path, repo_name):
-            stats.total_files += 1
-            stats.total_size_bytes += scanned_file.size_bytes
-
-            lang = scanned_file.language
-            stats.files_by_language[lang
-                                    ] = stats.files_by_language.get(lang,
-                                                                    0) + 1
+        deque(self.scan_repo(repo_path, repo_name, stats), maxlen = 0)
 
         return stats
 
 
+def _active_branch(repo_path: str) -> str:
+    """
+    Name of the checked out branch of a repository
+    Cached per path until .git/HEAD changes, so checkouts are picked up
+    """
+    head_path = os.path.join(repo_path, ".git", "HEAD")  # noqa: PTH118
+    try:
+        head_mtime = os.stat(head_path).st_mtime_ns  # noqa: PTH116
+    except OSError:
+        return _read_active_branch(repo_path)
+    return _cached_active_branch(repo_path, head_mtime)
+
+
+@functools.lru_cache(maxsize = 64)
+def _cached_active_branch(repo_path: str, head_mtime: int) -> str:
+    """
+    Active branch memoized on the repo path and its HEAD mtime
+    """
+    return _read_active_branch(repo_path)
+
+
+def _read_active_branch(repo_path: str) -> str:
+    """
+    Open the repository and read its active branch
+    """
+    git_repo = Repo(repo_path)
+    try:
+        return git_repo.active_branch.name
+    finally:
+        git_repo.close()
+
+
 class WeightedRepoSelector:
     """
     Selects repositories based on configured weights
@@ -262,6 +450,7 @@ class WeightedRepoSelector:
         """
         self.repos = [r for r in repos if r.enabled]
         self._weights = [r.weight for r in self.repos]
+        self._cum_weights = list(itertools.accumulate(self._weights))
         self._total_weight = sum(self._weights)
 
     def select(self) -> RepoEntry | None:
@@ -271,7 +460,11 @@ class WeightedRepoSelector:
         if not self.repos:
             return None
 
-        return random.choices(self.repos, weights = self._weights, k = 1)[0]
+        return random.choices(
+            self.repos,
+            cum_weights = self._cum_weights,
+            k = 1
+        )[0]
 
     def select_multiple(self, count: int) -> list[RepoEntry]:
         """
@@ -280,7 +473,11 @@ class WeightedRepoSelector:
         if not self.repos:
             return []
 
-        return random.choices(self.repos, weights = self._weights, k = count)
+        return random.choices(
+            self.repos,
+            cum_weights = self._cum_weights,
+            k = count
+        )
 
 
 def scan_repositories(
@@ -300,3 +497,55 @@ def scan_repositories(
 
         for scanned_file in scanner.scan_repo(repo.path, repo.name):
             yield repo, scanned_file
+
+
+def _parse_scanned_file(
+    scanned_file: ScannedFile,
+) -> tuple[list[ParsedFunction],
+           list[ParsedClass]]:
+    """
+    Parse one scanned file, treating unreadable files as empty
+    """
+    try:
+        return extract_file(scanned_file.path, scanned_file.language)
+    except (OSError, ValueError):
+        return [], []
+
+
+def parse_repositories(
+    repos: list[RepoEntry],
+    include_patterns: list[str] | None = None,
+    exclude_patterns: list[str] | None = None,
+    max_workers: int | None = None,
+) -> Iterator[tuple[ScannedFile,
+                    list[ParsedFunction],
+                    list[ParsedClass]]]:
+    """
+    Scan repositories and yield each file with its parsed functions and classes
+    Parsing is spread across a process pool once there are enough files
+    """
+    scanned_files = [
+        scanned_file for _, scanned_file in
+        scan_repositories(repos, include_patterns, exclude_patterns)
+    ]
+    max_workers = max_workers or os.cpu_count() or 1
+
+    if max_workers == 1 or len(scanned_files) < PARALLEL_PARSE_MIN_FILES:
+        for scanned_file in scanned_files:
+            yield scanned_file, *_parse_scanned_file(scanned_file)
+        return
+
+    with ProcessPoolExecutor(
+            max_workers = max_workers,
+            mp_context = multiprocessing.get_context("spawn"),
+            initializer = ParserManager.initialize,
+    ) as executor:
+        results = executor.map(
+            _parse_scanned_file,
+            scanned_files,
+            chunksize = PARSE_CHUNK_SIZE,
+        )
+        for scanned_file, (functions, classes) in zip(scanned_files,
+                                                      results,
+                                                      strict = True):
+            yield scanned_file, functions, classes
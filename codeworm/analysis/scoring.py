@@ -4,20 +4,28 @@ analysis/scoring.py
 """
 from __future__ import annotations
 
-import contextlib
+import os
+import subprocess
+import sys
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from pathlib import Path
 
-from typing import TYPE_CHECKING, ClassVar
+from typing import IO, TYPE_CHECKING, ClassVar
+
+from git import Git, GitCommandError
 
 from codeworm.analysis.complexity import ComplexityMetrics
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
     from git import Repo
 
+    from codeworm.core.cache import DiskCache
 
-@dataclass
+
+@dataclass(frozen = True, slots = True)
 class GitStats:
     """
     Git derived statistics for a file or function
@@ -27,16 +35,7 @@ class GitStats:
     last_modified: datetime | None = None
     unique_authors: int = 0
     is_new: bool = False
-
-    @property
-    def days_since_modified(self) -> int:
-        """
-        Days since last modification
-        """
-        if not self.last_modified:
-            return 999
-        delta = datetime.now() - self.last_modified
-        return delta.days
+    days_since_modified: int = 999
 
     @property
     def is_hot(self) -> bool:
@@ -53,7 +52,150 @@ class GitStats:
         return self.days_since_modified <= 30
 
 
-@dataclass
+@dataclass(frozen = True, slots = True)
+class BlameLine:
+    """
+    A commit touching a file, shared by every blamed line it last touched
+    Commit times stay unix timestamps so counting them needs no datetimes,
+    and author emails are interned so long histories share one copy each
+    """
+    sha: str
+    author_email: str
+    committer_time: int
+
+
+UNCOMMITTED_SHA = "0" * 40
+
+GIT_CACHE_VERSION = 2
+
+EMPTY_GIT_STATS = GitStats()
+
+ChurnEntry = tuple[str, datetime | None, dict[str, list[BlameLine]]]
+ScoreInput = tuple[ComplexityMetrics,
+                   GitStats | None,
+                   list[str] | None,
+                   bool,
+                   str]
+
+
+def parse_blame_porcelain(output: str) -> list[BlameLine]:
+    """
+    Parse git blame --porcelain output into one entry per source line
+    """
+    commits: dict[str, dict[str, str]] = {}
+    blame_lines: dict[str, BlameLine] = {}
+    lines: list[BlameLine] = []
+    sha = ""
+
+    for raw in output.splitlines():
+        if raw.startswith("\t"):
+            entry = blame_lines.get(sha)
+            if entry is None:
+                info = commits[sha]
+                entry = BlameLine(
+                    sha = sha,
+                    author_email = sys.intern(
+                        info.get("author-mail", "").strip("<>")
+                    ),
+                    committer_time = int(info.get("committer-time", 0)),
+                )
+                blame_lines[sha] = entry
+            lines.append(entry)
+            continue
+
+        key, _, value = raw.partition(" ")
+        if len(key) == 40 and value[: 1].isdigit():
+            sha = key
+            commits.setdefault(sha, {})
+        elif key in ("author-mail", "committer-time"):
+            commits[sha][key] = value
+
+    return lines
+
+
+def iter_nul_fields(
+    stream: IO[bytes],
+    chunk_size: int = 65536,
+) -> Iterator[bytes]:
+    """
+    Yield the NUL separated fields of a byte stream as they arrive
+    """
+    pending = b""
+    while chunk := stream.read(chunk_size):
+        fields = (pending + chunk).split(b"\x00")
+        pending = fields.pop()
+        yield from fields
+    if pending:
+        yield pending
+
+
+def parse_churn_log(
+    fields: Iterable[bytes],
+    per_path_limit: int,
+) -> tuple[dict[str,
+                list[BlameLine]],
+           int,
+           datetime | None]:
+    """
+    Bucket git log -z --name-only fields by touched path, newest first
+    Each commit is expected to start with an empty field and a
+    "sha time email" header; its first path carries a leading newline
+    Returns the per-path commits, the number of commits read, and the
+    oldest commit date seen
+    """
+    churn: dict[str, list[BlameLine]] = {}
+    count = 0
+    oldest: int | None = None
+    commit: BlameLine | None = None
+    expect_header = False
+
+    for field in fields:
+        if not field:
+            expect_header = True
+            continue
+
+        if expect_header:
+            expect_header = False
+            sha, timestamp, email = field.decode(
+                "utf-8",
+                errors = "replace"
+            ).split(" ", 2)
+            commit = BlameLine(
+                sha = sha,
+                author_email = sys.intern(email),
+                committer_time = int(timestamp),
+            )
+            count += 1
+            if oldest is None or commit.committer_time < oldest:
+                oldest = commit.committer_time
+            continue
+
+        if commit is None:
+            continue
+        path = os.fsdecode(field[1 :] if field[: 1] == b"\n" else field)
+        commits = churn.setdefault(path, [])
+        if len(commits) < per_path_limit:
+            commits.append(commit)
+
+    if oldest is None:
+        return churn, count, None
+    return churn, count, datetime.fromtimestamp(oldest)
+
+
+def shared_prefix(needles: Iterable[str]) -> str:
+    """
+    Longest string that every needle starts with
+    """
+    first, *rest = needles
+    size = len(first)
+    for needle in rest:
+        size = min(size, len(needle))
+        while needle[: size] != first[: size]:
+            size -= 1
+    return first[: size]
+
+
+@dataclass(frozen = True, slots = True)
 class InterestScore:
     """
     Computed interest score with breakdown
@@ -126,6 +268,9 @@ class InterestScorer:
     PARAM_CAP = 7
     CHURN_CAP = 5
     NOVELTY_DAYS = 30
+    BLAME_CACHE_SIZE = 256
+    HISTORY_MAX_COMMITS = 100
+    CHURN_MAX_COMMITS = 2000
 
     PATTERN_BONUSES: ClassVar[dict[str,
                                    int]] = {
@@ -139,11 +284,81 @@ class InterestScorer:
                                        "dataclass": 7,
                                    }
 
-    def __init__(self, git_repo: Repo | None = None) -> None:
+    SOURCE_PATTERNS: ClassVar[dict[str,
+                                   tuple[str,
+                                         ...]]] = {
+                                             "generator": ("yield",
+                                                           ),
+                                             "context_manager":
+                                             ("__enter__",
+                                              "__exit__"),
+                                         }
+
+    DECORATOR_PATTERNS: ClassVar[dict[str,
+                                      tuple[str,
+                                            ...]]] = {
+                                                "property": ("property",
+                                                             ),
+                                                "class_method":
+                                                ("classmethod",
+                                                 "staticmethod"),
+                                                "abstract": ("abstractmethod",
+                                                             ),
+                                                "dataclass": ("dataclass",
+                                                              ),
+                                            }
+
+    SOURCE_PROBES: ClassVar[dict[str,
+                                 str]] = {
+                                     kind: shared_prefix(needles)
+                                     for kind, needles in SOURCE_PATTERNS.items()
+                                 }
+    DECORATOR_PROBES: ClassVar[dict[str,
+                                    str]] = {
+                                        kind: shared_prefix(needles)
+                                        for kind,
+                                        needles in DECORATOR_PATTERNS.items()
+                                    }
+
+    def __init__(
+        self,
+        git_repo: Repo | None = None,
+        cache: DiskCache | None = None,
+    ) -> None:
         """
         Initialize scorer with optional git repo for stats
+        Repo-wide history walks are persisted in cache when given
         """
+        self._root_prefix: str | None = None
         self.git_repo = git_repo
+        self.cache = cache
+        self._blame_cache: dict[Path,
+                                tuple[tuple[str, int, int],
+                                      list[BlameLine]]] = {}
+        self._history_cache: dict[Path,
+                                  tuple[tuple[str, int],
+                                        list[BlameLine]]] = {}
+        self._churn_cache: dict[str, ChurnEntry] = {}
+        self._file_stats_cache: dict[Path, tuple[datetime, GitStats]] = {}
+
+    @property
+    def git_repo(self) -> Repo | None:
+        """
+        Repo that git stats are read from
+        """
+        return self._git_repo
+
+    @git_repo.setter
+    def git_repo(self, repo: Repo | None) -> None:
+        """
+        Switch repos, normalizing the working tree root once
+        Bare repos have no working tree, so their paths must already be
+        repo-relative
+        """
+        self._git_repo = repo
+        self._root_prefix = None
+        if repo is not None and repo.working_tree_dir is not None:
+            self._root_prefix = os.path.join(repo.working_tree_dir, "")  # noqa: PTH118
 
     def score(
         self,
@@ -156,54 +371,80 @@ class InterestScorer:
         """
         Calculate interest score for a function
         """
-        if git_stats is None:
-            git_stats = GitStats()
-
-        complexity_score = min(
-            metrics.cyclomatic_complexity / self.COMPLEXITY_CAP,
-            1.0
-        ) * 100
-        length_score = min(metrics.nloc / self.LENGTH_CAP, 1.0) * 100
-        nesting_score = min(
-            metrics.max_nesting_depth / self.NESTING_CAP,
-            1.0
-        ) * 100
-        param_score = min(metrics.parameter_count / self.PARAM_CAP, 1.0) * 100
-
-        churn_score = min(git_stats.commit_count_30d / self.CHURN_CAP, 1.0) * 100
-
-        days_old = git_stats.days_since_modified
-        novelty_score = max(
-            0,
-            (self.NOVELTY_DAYS - days_old) / self.NOVELTY_DAYS
-        ) * 100
-
-        pattern_bonus = self._calculate_pattern_bonus(
-            decorators,
-            is_async,
-            source
-        )
-
-        weighted_total = (
-            complexity_score * self.WEIGHTS["complexity"] +
-            length_score * self.WEIGHTS["length"] +
-            nesting_score * self.WEIGHTS["nesting"] +
-            param_score * self.WEIGHTS["parameters"] +
-            churn_score * self.WEIGHTS["churn"] +
-            novelty_score * self.WEIGHTS["novelty"] + pattern_bonus
-        )
-
-        return InterestScore(
-            total = min(weighted_total,
-                        100),
-            complexity_score = complexity_score * self.WEIGHTS["complexity"],
-            length_score = length_score * self.WEIGHTS["length"],
-            nesting_score = nesting_score * self.WEIGHTS["nesting"],
-            parameter_score = param_score * self.WEIGHTS["parameters"],
-            churn_score = churn_score * self.WEIGHTS["churn"],
-            novelty_score = novelty_score * self.WEIGHTS["novelty"],
-            pattern_bonus = pattern_bonus,
-        )
+        return self.score_batch(
+            [(metrics,
+              git_stats,
+              decorators,
+              is_async,
+              source)]
+        )[0]
+
+    def score_batch(self, rows: Iterable[ScoreInput]) -> list[InterestScore]:
+        """
+        Calculate interest scores for many functions in one loop
+        Caps and weights are read once per batch instead of once per function,
+        with each weight scaled to its share of the 100 point total up front
+        """
+        complexity_cap = self.COMPLEXITY_CAP
+        length_cap = self.LENGTH_CAP
+        nesting_cap = self.NESTING_CAP
+        param_cap = self.PARAM_CAP
+        churn_cap = self.CHURN_CAP
+        novelty_days = self.NOVELTY_DAYS
+        weights = self.WEIGHTS
+        complexity_points = weights["complexity"] * 100
+        length_points = weights["length"] * 100
+        nesting_points = weights["nesting"] * 100
+        param_points = weights["parameters"] * 100
+        churn_points = weights["churn"] * 100
+        novelty_points = weights["novelty"] * 100
+        pattern_bonus_of = self._calculate_pattern_bonus
+
+        scores = []
+        for metrics, git_stats, decorators, is_async, source in rows:
+            if git_stats is None:
+                git_stats = EMPTY_GIT_STATS
+
+            complexity = min(
+                metrics.cyclomatic_complexity / complexity_cap,
+                1.0
+            ) * complexity_points
+            length = min(metrics.nloc / length_cap, 1.0) * length_points
+            nesting = min(
+                metrics.max_nesting_depth / nesting_cap,
+                1.0
+            ) * nesting_points
+            params = min(metrics.parameter_count / param_cap, 1.0) * param_points
+            churn = min(
+                git_stats.commit_count_30d / churn_cap,
+                1.0
+            ) * churn_points
+            days_old = git_stats.days_since_modified
+            if days_old >= novelty_days:
+                novelty = 0.0
+            else:
+                novelty = (
+                    novelty_days - days_old
+                ) / novelty_days * novelty_points
+            pattern_bonus = pattern_bonus_of(decorators, is_async, source)
+
+            scores.append(
+                InterestScore(
+                    total = min(
+                        complexity + length + nesting + params + churn +
+                        novelty + pattern_bonus,
+                        100
+                    ),
+                    complexity_score = complexity,
+                    length_score = length,
+                    nesting_score = nesting,
+                    parameter_score = params,
+                    churn_score = churn,
+                    novelty_score = novelty,
+                    pattern_bonus = pattern_bonus,
+                )
+            )
+        return scores
 
     def _calculate_pattern_bonus(
         self,
@@ -222,77 +463,380 @@ class InterestScorer:
         if decorators:
             bonus += len(decorators) * self.PATTERN_BONUSES["decorator"]
 
-            decorator_text = " ".join(decorators).lower()
-            if "property" in decorator_text:
-                bonus += self.PATTERN_BONUSES["property"]
-            if "classmethod" in decorator_text or "staticmethod" in decorator_text:
-                bonus += self.PATTERN_BONUSES["class_method"]
-            if "abstractmethod" in decorator_text:
-                bonus += self.PATTERN_BONUSES["abstract"]
-            if "dataclass" in decorator_text:
-                bonus += self.PATTERN_BONUSES["dataclass"]
-
-        if "yield" in source:
-            bonus += self.PATTERN_BONUSES["generator"]
-        if "__enter__" in source or "__exit__" in source:
-            bonus += self.PATTERN_BONUSES["context_manager"]
+            bonus += self._matched_bonus(
+                " ".join(decorators).lower(),
+                self.DECORATOR_PATTERNS,
+                self.DECORATOR_PROBES,
+            )
+
+        return bonus + self._matched_bonus(
+            source,
+            self.SOURCE_PATTERNS,
+            self.SOURCE_PROBES,
+        )
 
+    def _matched_bonus(
+        self,
+        text: str,
+        patterns: dict[str,
+                       tuple[str,
+                             ...]],
+        probes: dict[str,
+                     str],
+    ) -> float:
+        """
+        Sum the bonus of every pattern kind with at least one needle in text
+        Substring search is done by str.__contains__, which beats a compiled
+        alternation regex on these few short literals
+        Each kind is first probed with its needles' common prefix, so text
+        without it costs one scan however many needles the kind has
+        """
+        bonus = 0.0
+        for kind, needles in patterns.items():
+            if probes[kind] not in text:
+                continue
+            if len(needles) == 1 or any(needle in text for needle in needles):
+                bonus += self.PATTERN_BONUSES[kind]
         return bonus
 
+    def _relative_path(self, file_path: Path) -> str:
+        """
+        Path of a file relative to the current repo working tree
+        Paths outside it, or already relative, are returned unchanged
+        """
+        path = str(file_path)
+        prefix = self._root_prefix
+        if prefix is not None and path.startswith(prefix):
+            return path[len(prefix) :]
+        return path
+
+    def prime_file_blame(self, file_path: Path) -> None:
+        """
+        Run git blame once for a file so per-function stats can slice it
+        Entries are reused while HEAD and the file's mtime and size are
+        unchanged, and with a disk cache across runs as well
+        """
+        if not self.git_repo:
+            return
+
+        try:
+            stat = file_path.stat()
+            head = self.git_repo.head.commit.hexsha
+        except Exception:
+            self._blame_cache.pop(file_path, None)
+            return
+        version = (head, stat.st_mtime_ns, stat.st_size)
+
+        cached = self._blame_cache.get(file_path)
+        if cached is not None and cached[0] == version:
+            return
+
+        lines = None
+        disk_key = None
+        try:
+            if self.cache is not None:
+                disk_key = (
+                    f"blame:{GIT_CACHE_VERSION}:{head}:{file_path}:"
+                    f"{stat.st_mtime_ns}:{stat.st_size}"
+                )
+                lines = self.cache.get(disk_key)
+            if lines is None:
+                output = self.git_repo.git.blame(
+                    "--porcelain",
+                    "--",
+                    self._relative_path(file_path),
+                )
+                lines = parse_blame_porcelain(output)
+                if self.cache is not None and disk_key is not None:
+                    self.cache.set(disk_key, lines)
+        except Exception:
+            self._blame_cache.pop(file_path, None)
+            return
+
+        self._blame_cache.pop(file_path, None)
+        if len(self._blame_cache) >= self.BLAME_CACHE_SIZE:
+            del self._blame_cache[next(iter(self._blame_cache))]
+        self._blame_cache[file_path] = (version, lines)
+
     def get_git_stats(
         self,
         file_path: Path,
-        _start_line: int = 0,
-        _end_line: int = 0
+        start_line: int = 0,
+        end_line: int = 0,
+        now: datetime | None = None,
     ) -> GitStats:
         """
-        Get git statistics for a file
+        Get git statistics for a function or the whole file
+        Uses the primed blame for the line range when available
+        Ages are measured from now, which callers can fix for a whole batch
         """
         if not self.git_repo:
-            return GitStats()
+            return EMPTY_GIT_STATS
+        if now is None:
+            now = datetime.now()
 
-        try:
-            commits_30d = 0
-            commits_90d = 0
-            last_modified = None
-            authors = set()
+        cached = self._blame_cache.get(file_path)
+        if cached is not None and start_line > 0:
+            stats = self._stats_from_blame(
+                cached[1][start_line - 1 : end_line or None],
+                now,
+            )
+            if stats is not None:
+                return stats
 
-            now = datetime.now()
-            cutoff_30d = now - timedelta(days = 30)
-            cutoff_90d = now - timedelta(days = 90)
+        return self._file_git_stats(file_path, now)
 
-            rel_path = str(file_path)
-            with contextlib.suppress(ValueError):
-                rel_path = str(file_path.relative_to(self.git_repo.working_dir))
+    def prime_file_history(self, file_path: Path) -> None:
+        """
+        Run git log once for a file and keep its recent commits in memory
+        Entries are reused while HEAD and the file's mtime are unchanged
+        """
+        if not self.git_repo:
+            return
 
-            for commit in self.git_repo.iter_commits(paths = rel_path,
-                                                     max_count = 100):
-                commit_date = datetime.fromtimestamp(commit.committed_date)
+        try:
+            version = (
+                self.git_repo.head.commit.hexsha,
+                file_path.stat().st_mtime_ns,
+            )
+        except Exception:
+            self._history_cache.pop(file_path, None)
+            return
 
-                if last_modified is None:
-                    last_modified = commit_date
+        cached = self._history_cache.get(file_path)
+        if cached is not None and cached[0] == version:
+            return
 
-                if commit_date >= cutoff_30d:
-                    commits_30d += 1
-                if commit_date >= cutoff_90d:
-                    commits_90d += 1
+        try:
+            output = self.git_repo.git.log(
+                "--follow",
+                f"--max-count={self.HISTORY_MAX_COMMITS}",
+                "--format=%H %ct %ae",
+                "--",
+                self._relative_path(file_path),
+            )
+            commits = []
+            for line in output.splitlines():
+                sha, timestamp, email = line.split(" ", 2)
+                commits.append(
+                    BlameLine(
+                        sha = sha,
+                        author_email = sys.intern(email),
+                        committer_time = int(timestamp),
+                    )
+                )
+        except Exception:
+            self._history_cache.pop(file_path, None)
+            return
 
-                authors.add(commit.author.email)
+        self._history_cache.pop(file_path, None)
+        if len(self._history_cache) >= self.BLAME_CACHE_SIZE:
+            del self._history_cache[next(iter(self._history_cache))]
+        self._history_cache[file_path] = (version, commits)
 
-            is_new = commits_90d <= 2 and last_modified and (
-                now - last_modified
-            ).days <= 14
+    def prime_repo_churn(self) -> bool:
+        """
+        Walk the current repo's history now so later file stats are lookups
+        With a disk cache this lets worker processes load the walk instead
+        of each repeating it
+        """
+        if not self.git_repo:
+            return False
+        return self._repo_churn() is not None
 
-            return GitStats(
-                commit_count_30d = commits_30d,
-                commit_count_90d = commits_90d,
-                last_modified = last_modified,
-                unique_authors = len(authors),
-                is_new = is_new,
+    def _repo_churn(
+        self,
+    ) -> tuple[datetime | None,
+               dict[str,
+                    list[BlameLine]]] | None:
+        """
+        Commits per path from a single walk over the repo's recent history
+        The walk is redone only when HEAD moves; the date is how far back
+        it reached, or None when it covered the whole history
+        Walks persist in the disk cache and are extended from the cached
+        HEAD when it is an ancestor of the current one, and walked afresh
+        when that HEAD is gone after history was rewritten
+        """
+        repo = self.git_repo
+        if repo is None:
+            return None
+        try:
+            head_commit = repo.head.commit
+            head = head_commit.hexsha
+        except Exception:
+            return None
+
+        key = str(repo.working_dir)
+        disk_key = f"churn:{GIT_CACHE_VERSION}:{self.CHURN_MAX_COMMITS}:{key}"
+        cached = self._churn_cache.get(key)
+        if cached is None and self.cache is not None:
+            cached = self.cache.get(disk_key)
+        if cached is not None and cached[0] == head:
+            self._churn_cache[key] = cached
+            return cached[1], cached[2]
+
+        entry = None
+        if cached is not None:
+            try:
+                if repo.is_ancestor(repo.commit(cached[0]), head_commit):
+                    entry = self._extend_churn(repo, cached, head)
+            except Exception:
+                entry = None
+        if entry is None:
+            try:
+                entry = self._walk_churn(repo, head)
+            except Exception:
+                return None
+
+        self._churn_cache[key] = entry
+        if self.cache is not None:
+            self.cache.set(disk_key, entry)
+        return entry[1], entry[2]
+
+    def _churn_log(
+        self,
+        repo: Repo,
+        revision: str,
+    ) -> tuple[dict[str,
+                    list[BlameLine]],
+               int,
+               datetime | None]:
+        """
+        Stream the bounded name-only git log for a revision or range
+        Output is parsed as it is produced instead of buffered whole
+        """
+        process = subprocess.Popen(  # noqa: S603
+            [
+                Git.GIT_PYTHON_GIT_EXECUTABLE or "git",
+                "-C",
+                str(repo.working_dir),
+                "log",
+                "-z",
+                f"--max-count={self.CHURN_MAX_COMMITS}",
+                "--format=%x00%H %ct %ae",
+                "--name-only",
+                revision,
+                "--",
+            ],
+            stdout = subprocess.PIPE,
+            stderr = subprocess.DEVNULL,
+        )
+        with process:
+            if process.stdout is None:
+                raise GitCommandError("log", "no output stream")
+            result = parse_churn_log(
+                iter_nul_fields(process.stdout),
+                self.HISTORY_MAX_COMMITS,
             )
+        if process.returncode != 0:
+            raise GitCommandError("log", process.returncode)
+        return result
 
-        except Exception:
-            return GitStats()
+    def _walk_churn(self, repo: Repo, head: str) -> ChurnEntry:
+        """
+        Build a churn entry from scratch
+        """
+        churn, count, oldest = self._churn_log(repo, head)
+        covered_since = oldest if count >= self.CHURN_MAX_COMMITS else None
+        return (head, covered_since, churn)
+
+    def _extend_churn(
+        self,
+        repo: Repo,
+        cached: ChurnEntry,
+        head: str,
+    ) -> ChurnEntry | None:
+        """
+        Prepend the commits made since a cached walk to its per-path lists
+        Returns None when too much happened since and a fresh walk is cheaper
+        """
+        churn, count, _ = self._churn_log(repo, f"{cached[0]}..{head}")
+        if count >= self.CHURN_MAX_COMMITS:
+            return None
+
+        limit = self.HISTORY_MAX_COMMITS
+        merged = dict(cached[2])
+        for path, commits in churn.items():
+            merged[path] = (commits + merged.get(path, []))[: limit]
+        return (head, cached[1], merged)
+
+    def _stats_from_blame(
+        self,
+        lines: list[BlameLine],
+        now: datetime,
+    ) -> GitStats | None:
+        """
+        Derive stats from the commits that last touched a range of lines
+        """
+        commits = {
+            line.sha: line
+            for line in lines if line.sha != UNCOMMITTED_SHA
+        }
+        if not commits:
+            return None
+        return self._stats_from_commits(list(commits.values()), now)
+
+    def _stats_from_commits(
+        self,
+        commits: list[BlameLine],
+        now: datetime,
+    ) -> GitStats:
+        """
+        Count recent commits, authors, and recency for a set of commits
+        """
+        if not commits:
+            return EMPTY_GIT_STATS
+
+        cutoff_30d = (now - timedelta(days = 30)).timestamp()
+        cutoff_90d = (now - timedelta(days = 90)).timestamp()
+
+        times = [commit.committer_time for commit in commits]
+        last_modified = datetime.fromtimestamp(max(times))
+        commits_90d = sum(1 for time in times if time >= cutoff_90d)
+        days_old = (now - last_modified).days
+
+        return GitStats(
+            commit_count_30d = sum(1 for time in times if time >= cutoff_30d),
+            commit_count_90d = commits_90d,
+            last_modified = last_modified,
+            unique_authors = len({commit.author_email for commit in commits}),
+            is_new = commits_90d <= 2 and days_old <= 14,
+            days_since_modified = days_old,
+        )
+
+    def _file_git_stats(self, file_path: Path, now: datetime) -> GitStats:
+        """
+        Get git statistics for a whole file from the repo-wide churn walk
+        Falls back to the file's own git log when the walk stopped short of
+        the 90 day window or never saw the file
+        Memoized per file for a given now, since every function of a file
+        without line blame resolves to the same whole-file stats
+        """
+        cached_stats = self._file_stats_cache.get(file_path)
+        if cached_stats is not None and cached_stats[0] == now:
+            return cached_stats[1]
+        stats = self._compute_file_git_stats(file_path, now)
+        self._file_stats_cache[file_path] = (now, stats)
+        return stats
+
+    def _compute_file_git_stats(self, file_path: Path, now: datetime) -> GitStats:
+        """
+        Build whole-file stats from the churn walk or the file's own log
+        """
+        churn = self._repo_churn()
+        if churn is not None:
+            covered_since, paths = churn
+            commits = paths.get(self._relative_path(file_path))
+            if covered_since is None:
+                return self._stats_from_commits(commits or [], now)
+            if commits and covered_since <= now - timedelta(days = 90):
+                return self._stats_from_commits(commits, now)
+
+        self.prime_file_history(file_path)
+        cached = self._history_cache.get(file_path)
+        if cached is None:
+            return EMPTY_GIT_STATS
+        return self._stats_from_commits(cached[1], now)
 
 
 def calculate_interest(
@@ -4,18 +4,30 @@ analysis/targets.py
 """
 from __future__ import annotations
 
+import functools
+import heapq
+import itertools
+import operator
+import os
 import random
+import subprocess
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import TYPE_CHECKING, ClassVar
 
-from git import InvalidGitRepositoryError, Repo
+from git import Git, InvalidGitRepositoryError, Repo
 
 from codeworm.analysis.parser import CodeExtractor
 from codeworm.analysis.scanner import RepoScanner
-from codeworm.models import LANGUAGE_EXTENSIONS, CodeSnippet, DocType, Language
+from codeworm.models import CodeSnippet, DocType, Language, language_for_filename
 
 if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+    from codeworm.analysis.scanner import ScannedFile
     from codeworm.core.config import RepoEntry
 
 
@@ -38,325 +50,580 @@ class DocumentationTarget:
         return self.snippet.display_name
 
 
+class SourceCache:
+    """
+    Bounded LRU of file contents shared by the finders of one router
+    Entries are revalidated against the file's mtime and size on each read
+    A smaller LRU keeps extractors, whose trees cost more than the bytes
+    """
+    MAX_ENTRIES = 2000
+    MAX_BYTES = 64 * 1024 * 1024
+    MAX_EXTRACTORS = 256
+
+    def __init__(
+        self,
+        max_entries: int = MAX_ENTRIES,
+        max_bytes: int = MAX_BYTES,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Path, tuple[int, int, bytes]] = OrderedDict()
+        self._bytes = 0
+        self._extractors: OrderedDict[Path,
+                                      tuple[bytes,
+                                            Language,
+                                            CodeExtractor]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def read_bytes(self, path: Path) -> bytes:
+        """
+        Return the file's bytes, reading from disk only when it changed
+        Line endings are normalized to \n, as Path.read_text would
+        """
+        stat = path.stat()
+        with self._lock:
+            cached = self._entries.get(path)
+            if (
+                cached is not None and cached[0] == stat.st_mtime_ns
+                and cached[1] == stat.st_size
+            ):
+                self._entries.move_to_end(path)
+                return cached[2]
+
+        raw = path.read_bytes()
+        if b"\r" in raw:
+            raw = raw.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+        with self._lock:
+            old = self._entries.pop(path, None)
+            if old is not None:
+                self._bytes -= len(old[2])
+            if len(raw) <= self.max_bytes // 4:
+                self._entries[path] = (stat.st_mtime_ns, stat.st_size, raw)
+                self._bytes += len(raw)
+                while (
+                    len(self._entries) > self.max_entries
+                    or self._bytes > self.max_bytes
+                ):
+                    _, (_, _, evicted) = self._entries.popitem(last = False)
+                    self._bytes -= len(evicted)
+        return raw
+
+    def extractor(
+        self,
+        path: Path,
+        language: Language,
+        raw: bytes | None = None,
+    ) -> CodeExtractor:
+        """
+        Return the file's extractor, reused while its bytes are unchanged
+        raw is the file's bytes when the caller already read them here
+        """
+        if raw is None:
+            raw = self.read_bytes(path)
+        with self._lock:
+            cached = self._extractors.get(path)
+            if cached is not None and cached[0] is raw and cached[1] == language:
+                self._extractors.move_to_end(path)
+                return cached[2]
+
+        extractor = CodeExtractor(raw, language)
+        with self._lock:
+            self._extractors.pop(path, None)
+            self._extractors[path] = (raw, language, extractor)
+            while len(self._extractors) > self.MAX_EXTRACTORS:
+                self._extractors.popitem(last = False)
+        return extractor
+
+    def clear(self) -> None:
+        """
+        Drop every cached file
+        """
+        with self._lock:
+            self._entries.clear()
+            self._extractors.clear()
+            self._bytes = 0
+
+
+def _collect_targets[T](
+    scanned_files: Iterable[ScannedFile],
+    evaluate: Callable[[ScannedFile],
+                       list[T]],
+    enough: int,
+    max_workers: int | None = None,
+) -> list[T]:
+    """
+    Evaluate files on a thread pool, keeping their scan order
+    Files are submitted a window at a time so stopping once enough targets
+    are found wastes at most one window of work
+    """
+    workers = max_workers or os.cpu_count() or 1
+    targets: list[T] = []
+    files = iter(scanned_files)
+    with ThreadPoolExecutor(max_workers = workers) as pool:
+        while window := list(itertools.islice(files, workers * 4)):
+            for found in pool.map(evaluate, window):
+                targets.extend(found)
+                if len(targets) >= enough:
+                    return targets
+    return targets
+
+
 class FileTargetFinder:
     """
     Finds files worth documenting at the file level
     """
-    def __init__(self, scanner: RepoScanner) -> None:
+    def __init__(
+        self,
+        scanner: RepoScanner,
+        source_cache: SourceCache | None = None,
+    ) -> None:
         self.scanner = scanner
+        self.source_cache = source_cache or SourceCache()
 
     def find(
         self,
         repo: RepoEntry,
         limit: int = 20,
     ) -> list[DocumentationTarget]:
-        targets: list[DocumentationTarget] = []
-
-        for scanned_file in self.scanner.scan_repo(repo.path, repo.name):
-            try:
-                source = scanned_file.path.read_text(encoding = "utf-8")
-            except Exception:  # noqa: S112
-                continue
-
-            line_count = source.count("\n") + 1
-            if line_count < 20:
-                continue
-
-            extractor = CodeExtractor(source, scanned_file.language)
-            func_count = sum(1 for _ in extractor.extract_functions())
-
-            score = min(
-                100.0,
-                (
-                    min(line_count / 200,
-                        1.0) * 30 + min(func_count / 8,
-                                        1.0) * 30 +
-                    min(scanned_file.size_bytes / 5000,
-                        1.0) * 20 + min(source.count("import ") / 10,
-                                        1.0) * 20
-                )
+        targets = _collect_targets(
+            self.scanner.scan_repo(repo.path, repo.name),
+            functools.partial(self._evaluate, repo),
+            limit * 2,
+        )
+        return heapq.nlargest(limit, targets, key = operator.attrgetter("score"))
+
+    def _evaluate(
+        self,
+        repo: RepoEntry,
+        scanned_file: ScannedFile,
+    ) -> list[DocumentationTarget]:
+        try:
+            raw = self.source_cache.read_bytes(scanned_file.path)
+        except Exception:
+            return []
+
+        line_count = raw.count(b"\n") + 1
+        if line_count < 20:
+            return []
+
+        extractor = self.source_cache.extractor(
+            scanned_file.path,
+            scanned_file.language,
+            raw,
+        )
+        func_count = sum(1 for _ in extractor.extract_functions())
+
+        score = min(
+            100.0,
+            (
+                min(line_count / 200,
+                    1.0) * 30 + min(func_count / 8,
+                                    1.0) * 30 +
+                min(scanned_file.size_bytes / 5000,
+                    1.0) * 20 + min(raw.count(b"import ") / 10,
+                                    1.0) * 20
             )
+        )
 
-            if score < 20:
-                continue
+        if score < 20:
+            return []
 
-            snippet = CodeSnippet(
-                repo = repo.name,
-                file_path = scanned_file.path,
-                function_name = None,
-                class_name = None,
-                language = scanned_file.language,
-                source = source[: 4000],
-                start_line = 1,
-                end_line = line_count,
-                interest_score = score,
+        try:
+            source = raw.decode("utf-8")
+        except UnicodeDecodeError:
+            return []
+
+        snippet = CodeSnippet(
+            repo = repo.name,
+            file_path = scanned_file.path,
+            function_name = None,
+            class_name = None,
+            language = scanned_file.language,
+            source = source[: 4000],
+            start_line = 1,
+            end_line = line_count,
+            interest_score = score,
+            doc_type = DocType.FILE_DOC,
+        )
+
+        return [
+            DocumentationTarget(
                 doc_type = DocType.FILE_DOC,
+                snippet = snippet,
+                source_context = source[: 6000],
+                metadata = {
+                    "line_count": line_count,
+                    "function_count": func_count,
+                    "relative_path": str(scanned_file.relative_path),
+                },
             )
-
-            targets.append(
-                DocumentationTarget(
-                    doc_type = DocType.FILE_DOC,
-                    snippet = snippet,
-                    source_context = source[: 6000],
-                    metadata = {
-                        "line_count": line_count,
-                        "function_count": func_count,
-                        "relative_path": str(scanned_file.relative_path),
-                    },
-                )
-            )
-
-            if len(targets) >= limit * 2:
-                break
-
-        targets.sort(key = lambda t: t.score, reverse = True)
-        return targets[: limit]
+        ]
 
 
 class ClassTargetFinder:
     """
     Finds classes worth documenting
     """
-    def __init__(self, scanner: RepoScanner) -> None:
+    def __init__(
+        self,
+        scanner: RepoScanner,
+        source_cache: SourceCache | None = None,
+    ) -> None:
         self.scanner = scanner
+        self.source_cache = source_cache or SourceCache()
 
     def find(
         self,
         repo: RepoEntry,
         limit: int = 20,
     ) -> list[DocumentationTarget]:
-        targets: list[DocumentationTarget] = []
-
-        for scanned_file in self.scanner.scan_repo(repo.path, repo.name):
-            try:
-                source = scanned_file.path.read_text(encoding = "utf-8")
-            except Exception:  # noqa: S112
-                continue
-
-            extractor = CodeExtractor(source, scanned_file.language)
-
-            for parsed_class in extractor.extract_classes():
-                method_count = len(parsed_class.methods or [])
-                line_count = parsed_class.end_line - parsed_class.start_line + 1
-
-                if line_count < 15:
-                    continue
-
-                score = min(
-                    100.0,
-                    (
-                        min(method_count / 6,
-                            1.0) * 35 + min(line_count / 100,
-                                            1.0) * 25 +
-                        (10 if parsed_class.docstring else 0) +
-                        min(len(parsed_class.decorators or []) * 5,
-                            15) + 15
-                    )
-                )
-
-                snippet = CodeSnippet(
-                    repo = repo.name,
-                    file_path = scanned_file.path,
-                    function_name = None,
-                    class_name = parsed_class.name,
-                    language = scanned_file.language,
-                    source = parsed_class.source[: 4000],
-                    start_line = parsed_class.start_line,
-                    end_line = parsed_class.end_line,
-                    interest_score = score,
-                    doc_type = DocType.CLASS_DOC,
-                )
-
-                targets.append(
-                    DocumentationTarget(
-                        doc_type = DocType.CLASS_DOC,
-                        snippet = snippet,
-                        source_context = parsed_class.source[: 6000],
-                        metadata = {
-                            "method_count":
-                            method_count,
-                            "method_names":
-                            [m.name for m in (parsed_class.methods or [])],
-                            "has_docstring":
-                            bool(parsed_class.docstring),
-                            "relative_path":
-                            str(scanned_file.relative_path),
-                        },
-                    )
-                )
-
-                if len(targets) >= limit * 2:
-                    break
-
-            if len(targets) >= limit * 2:
-                break
-
-        targets.sort(key = lambda t: t.score, reverse = True)
-        return targets[: limit]
-
-
-class ModuleTargetFinder:
-    """
-    Finds Python packages or directory-level modules to document
-    """
-    def find(
+        targets = _collect_targets(
+            self.scanner.scan_repo(repo.path, repo.name),
+            functools.partial(self._evaluate, repo),
+            limit * 2,
+        )[: limit * 2]
+        return heapq.nlargest(limit, targets, key = operator.attrgetter("score"))
+
+    def _evaluate(
         self,
         repo: RepoEntry,
-        limit: int = 10,
+        scanned_file: ScannedFile,
     ) -> list[DocumentationTarget]:
         targets: list[DocumentationTarget] = []
 
-        if not repo.path.exists():
-            return targets
-
-        for dirpath in repo.path.rglob("__init__.py"):
-            pkg_dir = dirpath.parent
-            rel_dir = pkg_dir.relative_to(repo.path)
-
-            skip_dirs = {
-                "node_modules",
-                ".git",
-                "venv",
-                ".venv",
-                "__pycache__",
-                "dist",
-                "build",
-                "vendor",
-                "target",
-                ".tox",
-                ".mypy_cache"
-            }
-            if any(part in skip_dirs for part in rel_dir.parts):
-                continue
-
-            py_files = list(pkg_dir.glob("*.py"))
-            file_count = len(py_files)
-
-            if file_count < 2:
+        try:
+            raw = self.source_cache.read_bytes(scanned_file.path)
+            raw.decode("utf-8")
+        except Exception:
+            return []
+        extractor = self.source_cache.extractor(
+            scanned_file.path,
+            scanned_file.language,
+            raw,
+        )
+
+        relative_path = str(scanned_file.relative_path)
+        for parsed_class in extractor.extract_classes():
+            line_count = parsed_class.end_line - parsed_class.start_line + 1
+            if line_count < 15:
                 continue
 
-            init_content = ""
-            try:  # noqa: SIM105
-                init_content = dirpath.read_text(encoding = "utf-8")
-            except Exception:  # noqa: S110
-                pass
-
-            file_listing = "\n".join(f"  - {f.name}" for f in sorted(py_files))
-            context = f"Package: {rel_dir}\nFiles ({file_count}):\n{file_listing}"
-
-            if init_content.strip():
-                context += f"\n\n__init__.py:\n{init_content[:2000]}"
+            methods = parsed_class.methods or []
+            method_count = len(methods)
+            decorator_count = len(parsed_class.decorators or ())
 
             score = min(
                 100.0,
                 (
-                    min(file_count / 8,
-                        1.0) * 40 + min(len(init_content) / 500,
-                                        1.0) * 30 + 30
+                    min(method_count / 6,
+                        1.0) * 35 + min(line_count / 100,
+                                        1.0) * 25 +
+                    (10 if parsed_class.docstring else 0) +
+                    min(decorator_count * 5,
+                        15) + 15
                 )
             )
 
             snippet = CodeSnippet(
                 repo = repo.name,
-                file_path = pkg_dir,
+                file_path = scanned_file.path,
                 function_name = None,
-                class_name = None,
-                language = Language.PYTHON,
-                source = context[: 4000],
-                start_line = 1,
-                end_line = 1,
+                class_name = parsed_class.name,
+                language = scanned_file.language,
+                source = parsed_class.source[: 4000],
+                start_line = parsed_class.start_line,
+                end_line = parsed_class.end_line,
                 interest_score = score,
-                doc_type = DocType.MODULE_DOC,
+                doc_type = DocType.CLASS_DOC,
             )
 
             targets.append(
                 DocumentationTarget(
-                    doc_type = DocType.MODULE_DOC,
+                    doc_type = DocType.CLASS_DOC,
                     snippet = snippet,
-                    source_context = context[: 6000],
+                    source_context = parsed_class.source[: 6000],
                     metadata = {
-                        "package_path": str(rel_dir),
-                        "file_count": file_count,
-                        "file_names": [f.name for f in py_files],
-                        "has_init_content": bool(init_content.strip()),
+                        "method_count": method_count,
+                        "method_names": [m.name for m in methods],
+                        "has_docstring": bool(parsed_class.docstring),
+                        "relative_path": relative_path,
                     },
                 )
             )
 
-            if len(targets) >= limit:
-                break
+        return targets
 
-        for dirpath in repo.path.rglob("index.ts"):
-            pkg_dir = dirpath.parent
-            rel_dir = pkg_dir.relative_to(repo.path)
 
-            skip_dirs = {"node_modules", ".git", "dist", "build"}
-            if any(part in skip_dirs for part in rel_dir.parts):
-                continue
+class ModuleTargetFinder:
+    """
+    Finds Python packages or directory-level modules to document
+    """
+    PYTHON_SKIP_DIRS: ClassVar[frozenset[str]] = frozenset(
+        {
+            "node_modules",
+            ".git",
+            "venv",
+            ".venv",
+            "__pycache__",
+            "dist",
+            "build",
+            "vendor",
+            "target",
+            ".tox",
+            ".mypy_cache"
+        }
+    )
+    TYPESCRIPT_SKIP_DIRS: ClassVar[frozenset[str]] = frozenset(
+        {"node_modules",
+         ".git",
+         "dist",
+         "build"}
+    )
 
-            ts_files = list(pkg_dir.glob("*.ts")) + list(pkg_dir.glob("*.tsx"))
-            file_count = len(ts_files)
+    def find(
+        self,
+        repo: RepoEntry,
+        limit: int = 10,
+    ) -> list[DocumentationTarget]:
+        python_targets: list[DocumentationTarget] = []
+        typescript_targets: list[DocumentationTarget] = []
 
-            if file_count < 2:
-                continue
+        if not repo.path.exists():
+            return python_targets
 
-            index_content = ""
-            try:  # noqa: SIM105
-                index_content = dirpath.read_text(encoding = "utf-8")
-            except Exception:  # noqa: S110
-                pass
+        prune = self.PYTHON_SKIP_DIRS & self.TYPESCRIPT_SKIP_DIRS
+        for dirpath, dirnames, filenames in os.walk(repo.path):
+            dirnames[:] = [d for d in dirnames if d not in prune]
+            if len(python_targets) >= limit and len(typescript_targets) >= limit:
+                break
 
-            file_listing = "\n".join(f"  - {f.name}" for f in sorted(ts_files))
-            context = f"Module: {rel_dir}\nFiles ({file_count}):\n{file_listing}"
-            if index_content.strip():
-                context += f"\n\nindex.ts:\n{index_content[:2000]}"
+            pkg_dir = Path(dirpath)
+            rel_dir = pkg_dir.relative_to(repo.path)
 
-            score = min(
-                100.0,
-                (
-                    min(file_count / 8,
-                        1.0) * 40 + min(len(index_content) / 500,
-                                        1.0) * 30 + 30
+            if (
+                len(python_targets) < limit and "__init__.py" in filenames
+                and not any(
+                    part in self.PYTHON_SKIP_DIRS for part in rel_dir.parts
                 )
-            )
-
-            snippet = CodeSnippet(
-                repo = repo.name,
-                file_path = pkg_dir,
-                function_name = None,
-                class_name = None,
-                language = Language.TYPESCRIPT,
-                source = context[: 4000],
-                start_line = 1,
-                end_line = 1,
-                interest_score = score,
-                doc_type = DocType.MODULE_DOC,
-            )
-
-            targets.append(
-                DocumentationTarget(
-                    doc_type = DocType.MODULE_DOC,
-                    snippet = snippet,
-                    source_context = context[: 6000],
-                    metadata = {
-                        "package_path": str(rel_dir),
-                        "file_count": file_count,
-                        "file_names": [f.name for f in ts_files],
-                    },
+            ):
+                target = self._python_target(repo, pkg_dir, rel_dir, filenames)
+                if target is not None:
+                    python_targets.append(target)
+
+            if (
+                len(typescript_targets) < limit and "index.ts" in filenames
+                and not any(
+                    part in self.TYPESCRIPT_SKIP_DIRS for part in rel_dir.parts
                 )
-            )
+            ):
+                target = self._typescript_target(
+                    repo,
+                    pkg_dir,
+                    rel_dir,
+                    filenames,
+                )
+                if target is not None:
+                    typescript_targets.append(target)
 
-            if len(targets) >= limit:
-                break
+        keep = max(1, limit - len(python_targets))
+        targets = python_targets + typescript_targets[: keep]
+        return heapq.nlargest(limit, targets, key = operator.attrgetter("score"))
 
-        targets.sort(key = lambda t: t.score, reverse = True)
-        return targets[: limit]
+    def _python_target(
+        self,
+        repo: RepoEntry,
+        pkg_dir: Path,
+        rel_dir: Path,
+        filenames: list[str],
+    ) -> DocumentationTarget | None:
+        py_files = [pkg_dir / name for name in filenames if name.endswith(".py")]
+        file_count = len(py_files)
+
+        if file_count < 2:
+            return None
+
+        init_content = ""
+        try:  # noqa: SIM105
+            init_content = (pkg_dir / "__init__.py").read_text(encoding = "utf-8")
+        except Exception:  # noqa: S110
+            pass
+
+        file_listing = "\n".join(f"  - {f.name}" for f in sorted(py_files))
+        context = f"Package: {rel_dir}\nFiles ({file_count}):\n{file_listing}"
+
+        if init_content.strip():
+            context += f"\n\n__init__.py:\n{init_content[:2000]}"
+
+        score = min(
+            100.0,
+            (
+                min(file_count / 8,
+                    1.0) * 40 + min(len(init_content) / 500,
+                                    1.0) * 30 + 30
+            )
+        )
+
+        snippet = CodeSnippet(
+            repo = repo.name,
+            file_path = pkg_dir,
+            function_name = None,
+            class_name = None,
+            language = Language.PYTHON,
+            source = context[: 4000],
+            start_line = 1,
+            end_line = 1,
+            interest_score = score,
+            doc_type = DocType.MODULE_DOC,
+        )
+
+        return DocumentationTarget(
+            doc_type = DocType.MODULE_DOC,
+            snippet = snippet,
+            source_context = context[: 6000],
+            metadata = {
+                "package_path": str(rel_dir),
+                "file_count": file_count,
+                "file_names": [f.name for f in py_files],
+                "has_init_content": bool(init_content.strip()),
+            },
+        )
+
+    def _typescript_target(
+        self,
+        repo: RepoEntry,
+        pkg_dir: Path,
+        rel_dir: Path,
+        filenames: list[str],
+    ) -> DocumentationTarget | None:
+        ts_files = [
+            pkg_dir / name for name in filenames if name.endswith(".ts")
+        ] + [pkg_dir / name for name in filenames if name.endswith(".tsx")]
+        file_count = len(ts_files)
+
+        if file_count < 2:
+            return None
+
+        index_content = ""
+        try:  # noqa: SIM105
+            index_content = (pkg_dir / "index.ts").read_text(encoding = "utf-8")
+        except Exception:  # noqa: S110
+            pass
+
+        file_listing = "\n".join(f"  - {f.name}" for f in sorted(ts_files))
+        context = f"Module: {rel_dir}\nFiles ({file_count}):\n{file_listing}"
+        if index_content.strip():
+            context += f"\n\nindex.ts:\n{index_content[:2000]}"
+
+        score = min(
+            100.0,
+            (
+                min(file_count / 8,
+                    1.0) * 40 + min(len(index_content) / 500,
+                                    1.0) * 30 + 30
+            )
+        )
+
+        snippet = CodeSnippet(
+            repo = repo.name,
+            file_path = pkg_dir,
+            function_name = None,
+            class_name = None,
+            language = Language.TYPESCRIPT,
+            source = context[: 4000],
+            start_line = 1,
+            end_line = 1,
+            interest_score = score,
+            doc_type = DocType.MODULE_DOC,
+        )
+
+        return DocumentationTarget(
+            doc_type = DocType.MODULE_DOC,
+            snippet = snippet,
+            source_context = context[: 6000],
+            metadata = {
+                "package_path": str(rel_dir),
+                "file_count": file_count,
+                "file_names": [f.name for f in ts_files],
+            },
+        )
+
+
+def _head_mtime(git_repo: Repo) -> int | None:
+    """
+    Modification time of the repository HEAD file, None if unreadable
+    """
+    try:
+        return (Path(git_repo.git_dir) / "HEAD").stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def _changed_paths(
+    git_repo: Repo,
+    pairs: list[tuple[str,
+                      str]],
+) -> dict[str,
+          list[tuple[str,
+                     ...]]]:
+    """
+    List the paths changed between each (commit, parent) pair in one call
+    Results are keyed by commit in git's path order, and a rename or copy
+    lists its source before its destination
+    """
+    stdin = "".join(f"{commit} {parent}\n" for commit, parent in pairs)
+    result = subprocess.run(  # noqa: S603
+        [
+            Git.GIT_PYTHON_GIT_EXECUTABLE or "git",
+            "-C",
+            str(git_repo.working_dir),
+            "diff-tree",
+            "--stdin",
+            "-r",
+            "-M",
+            "--raw",
+            "-z",
+        ],
+        input = stdin.encode(),
+        capture_output = True,
+        check = True,
+    )
+
+    changes: dict[str, list[tuple[str, ...]]] = {}
+    paths: list[tuple[str, ...]] = []
+    tokens = iter(result.stdout.split(b"\x00"))
+    for token in tokens:
+        if not token:
+            continue
+        if token[: 1] == b":":
+            status = token.rsplit(b" ", 1)[-1][: 1]
+            count = 2 if status in (b"R", b"C") else 1
+            paths.append(tuple(os.fsdecode(next(tokens)) for _ in range(count)))
+        else:
+            paths = changes.setdefault(token.decode("ascii"), [])
+    return changes
 
 
 class EvolutionTargetFinder:
     """
     Finds recently changed files and generates git diff context
     """
+    def __init__(self) -> None:
+        self._repo_cache: dict[Path, tuple[int | None, Repo]] = {}
+
+    def _open_repo(self, path: Path) -> Repo:
+        """
+        Reuse the Repo handle for path until its HEAD file changes
+        """
+        cached = self._repo_cache.get(path)
+        if cached is not None:
+            if cached[0] == _head_mtime(cached[1]):
+                return cached[1]
+            cached[1].close()
+
+        git_repo = Repo(path)
+        self._repo_cache[path] = (_head_mtime(git_repo), git_repo)
+        return git_repo
+
     def find(
         self,
         repo: RepoEntry,
@@ -365,35 +632,59 @@ class EvolutionTargetFinder:
         targets: list[DocumentationTarget] = []
 
         try:
-            git_repo = Repo(repo.path)
+            git_repo = self._open_repo(repo.path)
         except InvalidGitRepositoryError:
             return targets
 
         try:
-            commits = list(git_repo.iter_commits(max_count = 20))
+            pairs = list(
+                itertools.pairwise(git_repo.iter_commits(max_count = 20))
+            )
+            changed = _changed_paths(
+                git_repo,
+                [(commit.hexsha,
+                  parent.hexsha) for commit, parent in pairs],
+            )
         except Exception:
             return targets
 
         seen_files: set[str] = set()
 
-        for i, commit in enumerate(commits[:-1]):
-            parent = commits[i + 1]
-            try:
-                diffs = parent.diff(commit, create_patch = True)
-            except Exception:  # noqa: S112
-                continue
-
-            for diff in diffs:
-                file_path = diff.b_path or diff.a_path
-                if not file_path or file_path in seen_files:
+        for commit, parent in pairs:
+            wanted: list[tuple[str, Language]] = []
+            pathspecs: set[str] = set()
+            for paths in changed.get(commit.hexsha, []):
+                file_path = paths[-1]
+                if file_path in seen_files:
                     continue
 
-                ext = Path(file_path).suffix.lower()
-                language = LANGUAGE_EXTENSIONS.get(ext)
+                language = language_for_filename(file_path)
                 if not language:
                     continue
 
                 seen_files.add(file_path)
+                wanted.append((file_path, language))
+                pathspecs.update(f":(literal){path}" for path in paths)
+
+            if not wanted:
+                continue
+
+            try:
+                patches = {
+                    diff.b_path or diff.a_path: diff
+                    for diff in parent.diff(
+                        commit,
+                        paths = tuple(sorted(pathspecs)),
+                        create_patch = True,
+                    )
+                }
+            except Exception:  # noqa: S112
+                continue
+
+            for file_path, language in wanted:
+                diff = patches.get(file_path)
+                if diff is None:
+                    continue
 
                 try:
                     diff_text = diff.diff.decode("utf-8", errors = "replace")
@@ -456,130 +747,198 @@ class EvolutionTargetFinder:
             if len(targets) >= limit:
                 break
 
-        targets.sort(key = lambda t: t.score, reverse = True)
-        return targets[: limit]
+        return heapq.nlargest(limit, targets, key = operator.attrgetter("score"))
+
+
+@dataclass(frozen = True, slots = True)
+class PatternSignature:
+    """
+    Byte indicators that hint at a design pattern
+    """
+    name: str
+    indicators: tuple[bytes, ...]
+    description: str
+
+
+@dataclass(slots = True)
+class PatternMatch:
+    """
+    A pattern hit in one file, turned into a target only if it is selected
+    """
+    scanned_file: ScannedFile
+    signature: PatternSignature
+    matches: int
+    score: float
+    line_count: int
 
 
 class PatternTargetFinder:
     """
     Finds design patterns across a repository
     """
-    PATTERN_SIGNATURES: ClassVar[dict] = {
-        "singleton": {
-            "indicators": ["_instance",
-                           "__new__",
-                           "getInstance"],
-            "description": "Singleton pattern",
-        },
-        "factory": {
-            "indicators": ["create_",
-                           "make_",
-                           "build_",
-                           "factory"],
-            "description": "Factory pattern",
-        },
-        "observer": {
-            "indicators": [
-                "subscribe",
-                "notify",
-                "on_event",
-                "emit",
-                "listener",
-                "addEventListener"
-            ],
-            "description":
-            "Observer/Event pattern",
-        },
-        "decorator_pattern": {
-            "indicators": ["wrapper",
-                           "wraps",
-                           "functools.wraps",
-                           "@wraps"],
-            "description": "Decorator pattern",
-        },
-        "strategy": {
-            "indicators": ["Strategy",
-                           "execute",
-                           "set_strategy",
-                           "algorithm"],
-            "description": "Strategy pattern",
-        },
-        "middleware": {
-            "indicators": ["middleware",
-                           "next()",
-                           "dispatch",
-                           "use("],
-            "description": "Middleware/Pipeline pattern",
-        },
-        "repository_pattern": {
-            "indicators":
-            ["Repository",
-             "get_by_id",
-             "find_all",
-             "save(",
-             "delete("],
-            "description": "Repository pattern",
-        },
-    }
-
-    def __init__(self, scanner: RepoScanner) -> None:
+    PATTERN_SIGNATURES: ClassVar[tuple[PatternSignature,
+                                       ...]] = (
+                                           PatternSignature(
+                                               "singleton",
+                                               (b"_instance",
+                                                b"__new__",
+                                                b"getInstance"),
+                                               "Singleton pattern",
+                                           ),
+                                           PatternSignature(
+                                               "factory",
+                                               (b"create_",
+                                                b"make_",
+                                                b"build_",
+                                                b"factory"),
+                                               "Factory pattern",
+                                           ),
+                                           PatternSignature(
+                                               "observer",
+                                               (
+                                                   b"subscribe",
+                                                   b"notify",
+                                                   b"on_event",
+                                                   b"emit",
+                                                   b"listener",
+                                                   b"addEventListener",
+                                               ),
+                                               "Observer/Event pattern",
+                                           ),
+                                           PatternSignature(
+                                               "decorator_pattern",
+                                               (b"wrapper",
+                                                b"wraps",
+                                                b"functools.wraps",
+                                                b"@wraps"),
+                                               "Decorator pattern",
+                                           ),
+                                           PatternSignature(
+                                               "strategy",
+                                               (b"Strategy",
+                                                b"execute",
+                                                b"set_strategy",
+                                                b"algorithm"),
+                                               "Strategy pattern",
+                                           ),
+                                           PatternSignature(
+                                               "middleware",
+                                               (b"middleware",
+                                                b"next()",
+                                                b"dispatch",
+                                                b"use("),
+                                               "Middleware/Pipeline pattern",
+                                           ),
+                                           PatternSignature(
+                                               "repository_pattern",
+                                               (
+                                                   b"Repository",
+                                                   b"get_by_id",
+                                                   b"find_all",
+                                                   b"save(",
+                                                   b"delete(",
+                                               ),
+                                               "Repository pattern",
+                                           ),
+                                       )
+
+    def __init__(
+        self,
+        scanner: RepoScanner,
+        source_cache: SourceCache | None = None,
+    ) -> None:
         self.scanner = scanner
+        self.source_cache = source_cache or SourceCache()
 
     def find(
         self,
         repo: RepoEntry,
         limit: int = 10,
     ) -> list[DocumentationTarget]:
-        targets: list[DocumentationTarget] = []
-
-        for scanned_file in self.scanner.scan_repo(repo.path, repo.name):
-            try:
-                source = scanned_file.path.read_text(encoding = "utf-8")
-            except Exception:  # noqa: S112
-                continue
-
-            for pattern_name, pattern_info in self.PATTERN_SIGNATURES.items():
-                matches = sum(
-                    1 for indicator in pattern_info["indicators"]
-                    if indicator in source
-                )
-                if matches < 2:
-                    continue
-
-                score = min(100.0, matches * 15 + 30)
-
-                snippet = CodeSnippet(
-                    repo = repo.name,
-                    file_path = scanned_file.path,
-                    function_name = pattern_name,
-                    class_name = None,
-                    language = scanned_file.language,
-                    source = source[: 4000],
-                    start_line = 1,
-                    end_line = source.count("\n") + 1,
-                    interest_score = score,
-                    doc_type = DocType.PATTERN_ANALYSIS,
-                )
+        matches = _collect_targets(
+            self.scanner.scan_repo(repo.path, repo.name),
+            self._evaluate,
+            limit * 2,
+        )
+        targets = []
+        for match in heapq.nlargest(limit,
+                                    matches,
+                                    key = operator.attrgetter("score")):
+            target = self._build_target(repo, match)
+            if target is not None:
+                targets.append(target)
+        return targets
 
-                targets.append(
-                    DocumentationTarget(
-                        doc_type = DocType.PATTERN_ANALYSIS,
-                        snippet = snippet,
-                        source_context = source[: 6000],
-                        metadata = {
-                            "pattern": pattern_name,
-                            "pattern_description": pattern_info["description"],
-                            "indicator_matches": matches,
-                            "relative_path": str(scanned_file.relative_path),
-                        },
-                    )
-                )
+    def _evaluate(self, scanned_file: ScannedFile) -> list[PatternMatch]:
+        try:
+            raw = self.source_cache.read_bytes(scanned_file.path)
+        except Exception:
+            return []
 
-            if len(targets) >= limit * 2:
-                break
+        matched: list[tuple[PatternSignature, int]] = []
+        for signature in self.PATTERN_SIGNATURES:
+            matches = sum(
+                1 for indicator in signature.indicators if indicator in raw
+            )
+            if matches >= 2:
+                matched.append((signature, matches))
+        if not matched:
+            return []
 
-        targets.sort(key = lambda t: t.score, reverse = True)
-        return targets[: limit]
+        try:
+            raw.decode("utf-8")
+        except UnicodeDecodeError:
+            return []
+
+        line_count = raw.count(b"\n") + 1
+        return [
+            PatternMatch(
+                scanned_file = scanned_file,
+                signature = signature,
+                matches = matches,
+                score = min(100.0, matches * 15 + 30),
+                line_count = line_count,
+            ) for signature, matches in matched
+        ]
+
+    def _build_target(
+        self,
+        repo: RepoEntry,
+        match: PatternMatch,
+    ) -> DocumentationTarget | None:
+        scanned_file = match.scanned_file
+        signature = match.signature
+        try:
+            source = self.source_cache.read_bytes(scanned_file.path).decode(
+                "utf-8"
+            )
+        except Exception:
+            return None
+
+        snippet = CodeSnippet(
+            repo = repo.name,
+            file_path = scanned_file.path,
+            function_name = signature.name,
+            class_name = None,
+            language = scanned_file.language,
+            source = source[: 4000],
+            start_line = 1,
+            end_line = match.line_count,
+            interest_score = match.score,
+            doc_type = DocType.PATTERN_ANALYSIS,
+        )
+
+        return DocumentationTarget(
+            doc_type = DocType.PATTERN_ANALYSIS,
+            snippet = snippet,
+            source_context = source[: 6000],
+            metadata = {
+                "pattern": signature.name,
+                "pattern_description": signature.description,
+                "indicator_matches": match.matches,
+                "relative_path": str(scanned_file.relative_path),
+            },
+        )
 
 
 class FunctionPerspectiveFinder:
@@ -630,11 +989,12 @@ class TargetRouter:
         analyzer: object,
         scanner: RepoScanner,
     ) -> None:
-        self.file_finder = FileTargetFinder(scanner)
-        self.class_finder = ClassTargetFinder(scanner)
+        self.source_cache = SourceCache()
+        self.file_finder = FileTargetFinder(scanner, self.source_cache)
+        self.class_finder = ClassTargetFinder(scanner, self.source_cache)
         self.module_finder = ModuleTargetFinder()
         self.evolution_finder = EvolutionTargetFinder()
-        self.pattern_finder = PatternTargetFinder(scanner)
+        self.pattern_finder = PatternTargetFinder(scanner, self.source_cache)
         self.perspective_finder = FunctionPerspectiveFinder(analyzer)
 
     def find_targets(
@@ -684,21 +1044,41 @@ class TargetRouter:
         return []
 
 
-def select_doc_type(weights: dict[str, int]) -> DocType:
+@functools.lru_cache(maxsize = 32)
+def _doc_type_table(
+    items: tuple[tuple[str,
+                       int],
+                 ...],
+) -> tuple[tuple[DocType,
+                 ...],
+           tuple[int,
+                 ...]]:
     """
-    Weighted random selection of a documentation type
+    Valid doc types and their cumulative weights, built once per weight set
     """
     types = []
-    type_weights = []
+    cum_weights = []
+    total = 0
 
-    for type_str, weight in weights.items():
+    for type_str, weight in items:
         try:
-            types.append(DocType(type_str))
-            type_weights.append(weight)
+            doc_type = DocType(type_str)
         except ValueError:
             continue
+        total += weight
+        types.append(doc_type)
+        cum_weights.append(total)
+
+    return tuple(types), tuple(cum_weights)
+
+
+def select_doc_type(weights: dict[str, int]) -> DocType:
+    """
+    Weighted random selection of a documentation type
+    """
+    types, cum_weights = _doc_type_table(tuple(weights.items()))
 
     if not types:
         return DocType.FUNCTION_DOC
 
-    return random.choices(types, weights = type_weights, k = 1)[0]
+    return random.choices(types, cum_weights = cum_weights, k = 1)[0]
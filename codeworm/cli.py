@@ -4,27 +4,38 @@ cli.py
 """
 from __future__ import annotations
 
-import asyncio
+import functools
 import os
 import sys
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import click
-from rich.console import Console
-from rich.table import Table
 
-from codeworm.core import configure_logging, load_settings
+if TYPE_CHECKING:
+    from rich.console import Console
 
 
-console = Console()
+PATH_TYPE = click.Path(path_type = Path)
+EXISTING_PATH_TYPE = click.Path(exists = True, path_type = Path)
+REPO_PAIR_TYPE = click.Tuple([str, str])
+
+
+@functools.cache
+def get_console() -> Console:
+    """
+    Create the rich console on first use
+    """
+    from rich.console import Console
+
+    return Console()
 
 
 @click.group()
 @click.option("--debug", is_flag = True, help = "Enable debug logging")
 @click.option(
     "--config",
-    type = click.Path(exists = True,
-                      path_type = Path),
+    type = EXISTING_PATH_TYPE,
     help = "Path to config directory",
 )
 @click.pass_context
@@ -40,13 +51,12 @@ def cli(ctx: click.Context, debug: bool, config: Path | None) -> None:
 @cli.command()
 @click.option(
     "--devlog",
-    type = click.Path(path_type = Path),
+    type = PATH_TYPE,
     help = "Path to DevLog repository (overrides config)",
 )
 @click.option(
     "--repo",
-    type = (str,
-            str),
+    type = REPO_PAIR_TYPE,
     multiple = True,
     help = "Add repo as NAME PATH pairs (overrides config)",
 )
@@ -65,8 +75,11 @@ def run(
     """
     Run the CodeWorm daemon with scheduler
     """
+    from codeworm.core import configure_logging, load_settings
     from codeworm.daemon import CodeWormDaemon
 
+    console = get_console()
+
     overrides = {"debug": ctx.obj["debug"]}
 
     if devlog:
@@ -106,13 +119,12 @@ def run(
 @cli.command("run-once")
 @click.option(
     "--devlog",
-    type = click.Path(path_type = Path),
+    type = PATH_TYPE,
     help = "Path to DevLog repository (overrides config)",
 )
 @click.option(
     "--repo",
-    type = (str,
-            str),
+    type = REPO_PAIR_TYPE,
     multiple = True,
     help = "Add repo as NAME PATH pairs (overrides config)",
 )
@@ -121,18 +133,30 @@ def run(
     is_flag = True,
     help = "Generate docs but don't commit (for testing)",
 )
+@click.option(
+    "--count",
+    default = 1,
+    type = click.IntRange(min = 1),
+    help = "Number of cycles to run on one event loop",
+)
 @click.pass_context
 def run_once(
     ctx: click.Context,
     devlog: Path | None,
     repo: tuple,
-    dry_run: bool
+    dry_run: bool,
+    count: int,
 ) -> None:
     """
     Run a single documentation cycle then exit
     """
+    import asyncio
+
+    from codeworm.core import configure_logging, load_settings
     from codeworm.daemon import CodeWormDaemon
 
+    console = get_console()
+
     overrides = {"debug": ctx.obj["debug"]}
 
     if devlog:
@@ -158,14 +182,30 @@ def run_once(
         raise SystemExit(1)
 
     mode = "[yellow][DRY RUN][/yellow] " if dry_run else ""
-    console.print(f"{mode}[bold]Running single documentation cycle...[/bold]")
+    cycles = "single documentation cycle" if count == 1 else (
+        f"{count} documentation cycles"
+    )
+    console.print(f"{mode}[bold]Running {cycles}...[/bold]")
     console.print(f"  DevLog: {settings.devlog.repo_path}")
     console.print(f"  Repos: {[r.name for r in settings.repos]}")
 
     daemon = CodeWormDaemon(settings)
-    result = asyncio.run(daemon.run_once(dry_run = dry_run))
 
-    if result:
+    async def run_cycles() -> int:
+        generated = 0
+        for _ in range(count):
+            if await daemon.run_once(dry_run = dry_run):
+                generated += 1
+        return generated
+
+    generated = asyncio.run(run_cycles())
+
+    if generated and count > 1:
+        console.print(
+            f"[green]Documentation generated in {generated} of "
+            f"{count} cycles[/green]"
+        )
+    elif generated:
         console.print("[green]Documentation generated successfully[/green]")
     else:
         console.print(
@@ -176,8 +216,7 @@ def run_once(
 @cli.command()
 @click.option(
     "--repo",
-    type = click.Path(exists = True,
-                      path_type = Path),
+    type = EXISTING_PATH_TYPE,
     required = True,
     help = "Repository to analyze",
 )
@@ -187,9 +226,14 @@ def analyze(ctx: click.Context, repo: Path, limit: int) -> None:
     """
     Analyze a repository and show documentation candidates
     """
+    from rich.table import Table
+
     from codeworm.analysis import CodeAnalyzer, ParserManager
+    from codeworm.core import configure_logging
     from codeworm.core.config import RepoEntry
 
+    console = get_console()
+
     configure_logging(debug = ctx.obj["debug"])
     ParserManager.initialize()
 
@@ -198,7 +242,10 @@ def analyze(ctx: click.Context, repo: Path, limit: int) -> None:
 
     console.print(f"[bold]Analyzing {repo}...[/bold]\n")
 
-    candidates = analyzer.find_candidates(repo = repo_config, limit = limit)
+    try:
+        candidates = analyzer.find_candidates(repo = repo_config, limit = limit)
+    finally:
+        analyzer.shutdown()
 
     if not candidates:
         console.print("[yellow]No candidates found[/yellow]")
@@ -231,8 +278,13 @@ def schedule_preview(ctx: click.Context, days: int, timezone: str | None) -> Non
     """
     Preview upcoming scheduled commit times
     """
+    from rich.table import Table
+
+    from codeworm.core import configure_logging, load_settings
     from codeworm.scheduler import CodeWormScheduler
 
+    console = get_console()
+
     settings = load_settings(config_dir = ctx.obj["config_dir"])
     configure_logging(debug = ctx.obj["debug"])
 
@@ -264,7 +316,7 @@ def schedule_preview(ctx: click.Context, days: int, timezone: str | None) -> Non
 @cli.command()
 @click.option(
     "--devlog",
-    type = click.Path(path_type = Path),
+    type = PATH_TYPE,
     help = "Path to DevLog repository (overrides config)",
 )
 @click.pass_context
@@ -272,7 +324,9 @@ def stats(ctx: click.Context, devlog: Path | None) -> None:
     """
     Show documentation statistics
     """
-    from codeworm.core import StateManager
+    from codeworm.core import StateManager, load_settings
+
+    console = get_console()
 
     overrides = {"debug": ctx.obj["debug"]}
     if devlog:
@@ -283,22 +337,26 @@ def stats(ctx: click.Context, devlog: Path | None) -> None:
     state = StateManager(settings.db_path)
     stats_data = state.get_stats()
 
-    console.print("\n[bold]CodeWorm Statistics[/bold]\n")
-    console.print(
-        f"Total documented: [green]{stats_data['total_documented']}[/green]"
-    )
-    console.print(f"Last 7 days: [cyan]{stats_data['last_7_days']}[/cyan]")
+    lines = [
+        "\n[bold]CodeWorm Statistics[/bold]\n",
+        f"Total documented: [green]{stats_data['total_documented']}[/green]",
+        f"Last 7 days: [cyan]{stats_data['last_7_days']}[/cyan]",
+    ]
 
     if stats_data["by_repo"]:
-        console.print("\n[bold]By Repository:[/bold]")
-        for repo_name, count in stats_data["by_repo"].items():
-            console.print(f"  {repo_name}: {count}")
+        lines.append("\n[bold]By Repository:[/bold]")
+        lines.extend(
+            f"  {repo_name}: {count}"
+            for repo_name, count in stats_data["by_repo"].items()
+        )
+
+    console.print("\n".join(lines))
 
 
 @cli.command()
 @click.option(
     "--devlog",
-    type = click.Path(path_type = Path),
+    type = PATH_TYPE,
     help = "Path to DevLog repository (overrides config)",
 )
 @click.pass_context
@@ -306,8 +364,11 @@ def init(ctx: click.Context, devlog: Path | None) -> None:
     """
     Initialize a new DevLog repository
     """
+    from codeworm.core import configure_logging, load_settings
     from codeworm.git import DevLogRepository
 
+    console = get_console()
+
     overrides = {}
     if devlog:
         overrides["devlog"] = {"repo_path": devlog}
@@ -322,17 +383,19 @@ def init(ctx: click.Context, devlog: Path | None) -> None:
     repo = DevLogRepository(repo_path = settings.devlog.repo_path)
     repo.ensure_directory_structure()
 
-    console.print("[green]DevLog initialized successfully[/green]")
-    console.print("\nDirectory structure created:")
-    console.print("  snippets/python/")
-    console.print("  snippets/typescript/")
-    console.print("  snippets/javascript/")
-    console.print("  snippets/go/")
-    console.print("  snippets/rust/")
-    console.print("  analysis/weekly/")
-    console.print("  analysis/monthly/")
-    console.print("  patterns/")
-    console.print("  stats/")
+    console.print(
+        "[green]DevLog initialized successfully[/green]\n"
+        "\nDirectory structure created:\n"
+        "  snippets/python/\n"
+        "  snippets/typescript/\n"
+        "  snippets/javascript/\n"
+        "  snippets/go/\n"
+        "  snippets/rust/\n"
+        "  analysis/weekly/\n"
+        "  analysis/monthly/\n"
+        "  patterns/\n"
+        "  stats/"
+    )
 
 
 @cli.command()
@@ -350,6 +413,10 @@ def dashboard(ctx: click.Context, host: str | None, port: int | None) -> None:
     """
     import uvicorn
 
+    from codeworm.core import load_settings
+
+    console = get_console()
+
     settings = load_settings(config_dir = ctx.obj["config_dir"])
 
     bind_host = host or settings.dashboard.host
@@ -378,6 +445,7 @@ def version() -> None:
     """
     from codeworm import __version__
 
+    console = get_console()
     console.print(f"[bold]CodeWorm[/bold] v{__version__}")
 
 
@@ -389,10 +457,10 @@ def main() -> int:
         cli()
         return 0
     except KeyboardInterrupt:
-        console.print("\n[yellow]Interrupted[/yellow]")
+        get_console().print("\n[yellow]Interrupted[/yellow]")
         return 130
     except Exception as e:
-        console.print(f"[red]Error:[/red] {e}")
+        get_console().print(f"[red]Error:[/red] {e}")
         return 1
 
 
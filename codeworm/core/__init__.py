@@ -2,6 +2,7 @@
 ⒸAngelaMos | 2026
 core/__init__.py
 """
+from codeworm.core.cache import DEFAULT_CACHE_DIR, DiskCache
 from codeworm.core.config import (
     AnalyzerSettings,
     CodeWormSettings,
@@ -12,6 +13,7 @@ from codeworm.core.config import (
     ScheduleSettings,
     get_enabled_repos,
     get_settings,
+    invalidate_settings,
     load_settings,
 )
 from codeworm.core.events import EventPublisher, get_publisher, init_publisher
@@ -20,9 +22,11 @@ from codeworm.core.state import StateManager
 
 
 __all__ = [
+    "DEFAULT_CACHE_DIR",
     "AnalyzerSettings",
     "CodeWormSettings",
     "DevLogSettings",
+    "DiskCache",
     "EventPublisher",
     "OllamaSettings",
     "PromptSettings",
@@ -35,5 +39,6 @@ __all__ = [
     "get_publisher",
     "get_settings",
     "init_publisher",
+    "invalidate_settings",
     "load_settings",
 ]
@@ -0,0 +1,178 @@
+"""
+ⒸAngelaMos | 2026
+core/cache.py
+"""
+from __future__ import annotations
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from codeworm.core.logging import get_logger
+
+
+DEFAULT_CACHE_DIR = Path(
+    os.environ.get("CODEWORM_CACHE_DIR")
+    or Path(os.environ.get("XDG_CACHE_HOME", "~/.cache")) / "codeworm"
+).expanduser()
+
+logger = get_logger("cache")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    accessed_at REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_accessed ON entries(accessed_at);
+"""
+
+
+class DiskCache:
+    """
+    Pickle-backed LRU cache stored in SQLite
+    Each process opens its own connection so worker pools can share a file
+    Reads only note their keys, and access times are written in batches
+    so readers in different processes do not queue on the write lock
+    """
+    EVICT_EVERY = 256
+    TOUCH_EVERY = 256
+
+    def __init__(self, path: Path, max_entries: int = 20000) -> None:
+        """
+        Initialize cache at the given database path
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self._conn: sqlite3.Connection | None = None
+        self._pid: int | None = None
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._touched: set[str] = set()
+
+    def _get_conn(self) -> sqlite3.Connection:
+        """
+        Open the connection on first use in the current process
+        """
+        pid = os.getpid()
+        if self._conn is None or self._pid != pid:
+            self.path.parent.mkdir(parents = True, exist_ok = True)
+            conn = sqlite3.connect(
+                self.path,
+                timeout = 10,
+                isolation_level = None,
+                check_same_thread = False,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+            self._pid = pid
+        return self._conn
+
+    def get(self, key: str) -> Any | None:
+        """
+        Return the cached value for key or None on miss
+        """
+        try:
+            with self._lock:
+                conn = self._get_conn()
+                row = conn.execute(
+                    "SELECT value FROM entries WHERE key = ?",
+                    (key,
+                     ),
+                ).fetchone()
+                if row is None:
+                    return None
+                self._touched.add(key)
+                if len(self._touched) >= self.TOUCH_EVERY:
+                    self._flush_touched(conn)
+            return pickle.loads(row[0])  # noqa: S301
+        except Exception as e:
+            logger.debug(
+                "cache_read_failed",
+                path = str(self.path),
+                error = str(e),
+            )
+            return None
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Store value under key, evicting least recently used entries
+        """
+        try:
+            blob = pickle.dumps(value, protocol = pickle.HIGHEST_PROTOCOL)
+            with self._lock:
+                conn = self._get_conn()
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, accessed_at) "
+                    "VALUES (?, ?, ?)",
+                    (key,
+                     blob,
+                     time.time()),
+                )
+                self._touched.discard(key)
+                self._writes += 1
+                if self._writes % self.EVICT_EVERY == 0:
+                    self._flush_touched(conn)
+                    self._evict(conn)
+        except Exception as e:
+            logger.debug(
+                "cache_write_failed",
+                path = str(self.path),
+                error = str(e),
+            )
+
+    def _flush_touched(self, conn: sqlite3.Connection) -> None:
+        """
+        Write the access time of every key read since the last flush
+        """
+        if not self._touched:
+            return
+        now = time.time()
+        rows = [(now, key) for key in self._touched]
+        self._touched.clear()
+        conn.execute("BEGIN")
+        with conn:
+            conn.executemany(
+                "UPDATE entries SET accessed_at = ? WHERE key = ?",
+                rows,
+            )
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """
+        Drop everything beyond max_entries by last access time
+        """
+        conn.execute(
+            """
+            DELETE FROM entries WHERE key IN (
+                SELECT key FROM entries
+                ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_entries,
+             ),
+        )
+
+    def close(self) -> None:
+        """
+        Close the connection owned by this process
+        """
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                try:
+                    self._flush_touched(self._conn)
+                except sqlite3.Error as e:
+                    logger.debug(
+                        "cache_write_failed",
+                        path = str(self.path),
+                        error = str(e),
+                    )
+                self._conn.close()
+            self._conn = None
+            self._pid = None
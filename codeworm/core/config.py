@@ -4,18 +4,38 @@ config.py
 """
 from __future__ import annotations
 
+import copy
+import functools
 import os
 from pathlib import Path
 from typing import Annotated, Any
 
+import orjson
 import yaml
 from pydantic import BaseModel, Field, SecretStr, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader  # type: ignore[assignment]
+
 
 DEFAULT_CONFIG_DIR = Path(__file__).parent.parent.parent / "config"
 
 
+def _expand_path(value: Any) -> Any:
+    """
+    Expand ~ and environment variables in string paths
+    Strings without a $ skip expandvars, other values pass through
+    """
+    if not isinstance(value, str):
+        return value
+    if "$" in value:
+        value = os.path.expandvars(value)
+    return Path(value).expanduser()
+
+
 class DevLogSettings(BaseModel):
     """
     Settings for the DevLog output repository
@@ -30,9 +50,7 @@ class DevLogSettings(BaseModel):
         """
         Expand ~ and environment variables in path
         """
-        if isinstance(v, str):
-            return Path(os.path.expandvars(v)).expanduser()
-        return v
+        return _expand_path(v)
 
 
 class OllamaSettings(BaseModel):
@@ -78,6 +96,7 @@ class AnalyzerSettings(BaseModel):
     min_complexity: int = 3
     max_lines: int = 150
     min_lines: int = 15
+    use_cache: bool = True
     include_patterns: list[str] = Field(
         default_factory = lambda:
         ["**/*.py", "**/*.ts", "**/*.tsx", "**/*.js", "**/*.go", "**/*.rs"]
@@ -176,9 +195,7 @@ class RepoEntry(BaseModel):
         """
         Expand ~ and environment variables in path
         """
-        if isinstance(v, str):
-            return Path(os.path.expandvars(v)).expanduser()
-        return v
+        return _expand_path(v)
 
 
 class PromptSettings(BaseModel):
@@ -227,9 +244,7 @@ class CodeWormSettings(BaseSettings):
         """
         Expand ~ and environment variables in path
         """
-        if isinstance(v, str):
-            return Path(os.path.expandvars(v)).expanduser()
-        return v
+        return _expand_path(v)
 
     @property
     def db_path(self) -> Path:
@@ -239,15 +254,25 @@ class CodeWormSettings(BaseSettings):
         return self.data_dir / "codeworm.db"
 
 
+@functools.lru_cache(maxsize = 32)
+def _parse_yaml_file(path: Path, mtime_ns: int, size: int) -> Any:
+    """
+    Parse a YAML file, memoized on its stat signature so edits are picked up
+    """
+    return yaml.load(path.read_bytes(), Loader = YamlLoader)
+
+
 def load_yaml_file(path: Path) -> dict:
     """
     Load a YAML file and return its contents
     Returns empty dict if file does not exist
     """
-    if not path.exists():
+    try:
+        stat = path.stat()
+    except OSError:
         return {}
-    with path.open() as f:
-        return yaml.safe_load(f) or {}
+    data = _parse_yaml_file(path, stat.st_mtime_ns, stat.st_size)
+    return copy.deepcopy(data) if data else {}
 
 
 def merge_configs(base: dict, override: dict) -> dict:
@@ -256,13 +281,17 @@ def merge_configs(base: dict, override: dict) -> dict:
     Override takes precedence
     """
     result = base.copy()
-    for key, value in override.items():
-        if key in result and isinstance(result[key],
-                                        dict) and isinstance(value,
-                                                             dict):
-            result[key] = merge_configs(result[key], value)
-        else:
-            result[key] = value
+    stack = [(result, override)]
+    while stack:
+        target, source = stack.pop()
+        for key, value in source.items():
+            current = target.get(key)
+            if isinstance(current, dict) and isinstance(value, dict):
+                current = current.copy()
+                target[key] = current
+                stack.append((current, value))
+            else:
+                target[key] = value
     return result
 
 
@@ -302,6 +331,9 @@ def _strip_empty_strings(d: dict) -> dict:
 
 
 _settings: CodeWormSettings | None = None
+_settings_cache: tuple[bytes, CodeWormSettings] | None = None
+
+SETTINGS_FILES = ("config.yaml", "repos.yaml", "prompts.yaml")
 
 
 def get_settings() -> CodeWormSettings:
@@ -317,6 +349,47 @@ def get_settings() -> CodeWormSettings:
     return _settings
 
 
+def invalidate_settings() -> None:
+    """
+    Forget the cached settings so the next load_settings() rebuilds them
+    """
+    global _settings_cache
+    _settings_cache = None
+
+
+def _file_signature(path: Path) -> tuple[int, int] | None:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _settings_key(config_dir: Path | None, overrides: dict) -> bytes:
+    """
+    Fingerprint of every input load_settings reads
+    Covers the YAML files, .env, overrides and the whole environment, since
+    paths in the YAML may reference any variable through $VAR expansion
+    """
+    yaml_dir = Path(
+        os.path.expandvars(str(config_dir or DEFAULT_CONFIG_DIR))
+    ).expanduser()
+    env_file = Path(".env").absolute()
+    files = [yaml_dir / name for name in SETTINGS_FILES]
+    files.append(env_file)
+
+    return orjson.dumps(
+        {
+            "config_dir": str(config_dir),
+            "files": [(str(path), _file_signature(path)) for path in files],
+            "env": sorted(os.environ.items()),
+            "overrides": overrides,
+        },
+        default = str,
+        option = orjson.OPT_SORT_KEYS,
+    )
+
+
 def load_settings(
     config_dir: Path | str | None = None,
     **overrides
@@ -330,11 +403,17 @@ def load_settings(
     3. YAML config files
     4. Default values
     """
-    global _settings
+    global _settings, _settings_cache
 
     if config_dir is not None:
         config_dir = Path(os.path.expandvars(str(config_dir))).expanduser()
 
+    key = _settings_key(config_dir, overrides)
+    if _settings_cache is not None and _settings_cache[0] == key:
+        _settings = _settings_cache[1].model_copy(deep = True)
+        _settings.data_dir.mkdir(parents = True, exist_ok = True)
+        return _settings
+
     yaml_config = load_config_from_yaml(config_dir)
     yaml_config = _strip_empty_strings(yaml_config)
 
@@ -343,7 +422,9 @@ def load_settings(
     if config_dir is not None:
         merged["config_dir"] = config_dir
 
-    _settings = CodeWormSettings(**merged)
+    settings = CodeWormSettings(**merged)
+    _settings_cache = (key, settings)
+    _settings = settings.model_copy(deep = True)
     _settings.data_dir.mkdir(parents = True, exist_ok = True)
 
     return _settings
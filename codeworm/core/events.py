@@ -4,20 +4,35 @@ core/events.py
 """
 from __future__ import annotations
 
+import atexit
+import contextlib
+import queue
 import threading
+import time
 from datetime import datetime
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import orjson
 
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+    from structlog.types import EventDict
+
 
 _publisher: EventPublisher | None = None
 
 
 class EventPublisher:
+    """
+    Publishes logs, events and stats to Redis from a background thread
+    Callers only serialize and enqueue, the worker batches the PUBLISHes
+    """
     CHANNEL_LOGS = "codeworm:logs"
     CHANNEL_EVENTS = "codeworm:events"
     CHANNEL_STATS = "codeworm:stats"
+    MAX_PENDING = 10000
+    BATCH_SIZE = 256
 
     def __init__(self, redis_url: str) -> None:
         import redis as redis_lib
@@ -28,9 +43,21 @@ class EventPublisher:
             socket_connect_timeout = 2,
             socket_timeout = 2,
         )
-        self._lock = threading.Lock()
+        self._queue: queue.Queue[tuple[str,
+                                       bytes] | None] = queue.Queue(
+                                           maxsize = self.MAX_PENDING
+                                       )
+        self._closed = False
+        self._close_lock = threading.Lock()
+        self._ts_cache: tuple[int, str] = (-1, "")
         self._connected = False
         self._check_connection()
+        self._worker = threading.Thread(
+            target = self._drain,
+            name = "codeworm-events",
+            daemon = True,
+        )
+        self._worker.start()
 
     def _check_connection(self) -> bool:
         try:
@@ -41,35 +68,104 @@ class EventPublisher:
             self._connected = False
             return False
 
-    def _publish(self, channel: str, data: dict) -> None:
-        if not self._connected and not self._check_connection():
+    def _publish(self, channel: str, data: Mapping[str, Any]) -> None:
+        """
+        Enqueue a message, dropping the oldest one when the queue is full
+        The close lock keeps a drop from ever taking close()'s sentinel
+        """
+        if self._closed:
             return
         try:
             payload = orjson.dumps(data, default = str)
-            with self._lock:
-                self._client.publish(channel, payload)
+        except Exception:
+            return
+        with self._close_lock:
+            if self._closed:
+                return
+            try:
+                self._queue.put_nowait((channel, payload))
+            except queue.Full:
+                with contextlib.suppress(queue.Empty):
+                    self._queue.get_nowait()
+                with contextlib.suppress(queue.Full):
+                    self._queue.put_nowait((channel, payload))
+
+    def _drain(self) -> None:
+        """
+        Send queued messages in pipelined batches until close() is called
+        """
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            stop = False
+            while len(batch) < self.BATCH_SIZE:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._send(batch)
+            if stop:
+                return
+
+    def _send(self, batch: list[tuple[str, bytes]]) -> None:
+        if not self._connected and not self._check_connection():
+            return
+        try:
+            pipe = self._client.pipeline(transaction = False)
+            for channel, payload in batch:
+                pipe.publish(channel, payload)
+            pipe.execute()
         except Exception:
             self._connected = False
 
-    def publish_log(self, event_dict: dict) -> None:
+    def _now_iso(self) -> str:
+        """
+        Local time in datetime.isoformat() form
+        The seconds part is formatted once per second and reused
+        """
+        sec, rem = divmod(time.time_ns(), 1_000_000_000)
+        cached_sec, prefix = self._ts_cache
+        if sec != cached_sec:
+            prefix = datetime.fromtimestamp(sec).isoformat()
+            self._ts_cache = (sec, prefix)
+        micro = rem // 1000
+        return f"{prefix}.{micro:06d}" if micro else prefix
+
+    def publish_log(self, event_dict: EventDict) -> None:
         self._publish(self.CHANNEL_LOGS, event_dict)
 
     def publish_event(self, event_type: str, data: dict | None = None) -> None:
         payload = {
             "type": event_type,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": self._now_iso(),
             "data": data or {},
         }
         self._publish(self.CHANNEL_EVENTS, payload)
 
     def publish_stats(self, stats: dict) -> None:
         payload = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": self._now_iso(),
             **stats,
         }
         self._publish(self.CHANNEL_STATS, payload)
 
-    def close(self) -> None:
+    def close(self, timeout: float = 5.0) -> None:
+        """
+        Flush pending messages and close the connection
+        """
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+        with contextlib.suppress(queue.Full):
+            self._queue.put(None, timeout = timeout)
+        self._worker.join(timeout)
         try:  # noqa: SIM105
             self._client.close()
         except Exception:  # noqa: S110
@@ -79,8 +175,8 @@ class EventPublisher:
 def redis_log_processor(
     logger: Any,
     method_name: str,
-    event_dict: dict,
-) -> dict:
+    event_dict: EventDict,
+) -> EventDict:
     publisher = get_publisher()
     if publisher is not None:
         publisher.publish_log(event_dict)
@@ -90,6 +186,7 @@ def redis_log_processor(
 def init_publisher(redis_url: str) -> EventPublisher:
     global _publisher
     _publisher = EventPublisher(redis_url)
+    atexit.register(_publisher.close)
     return _publisher
 
 
@@ -2,15 +2,19 @@
 ⒸAngelaMos | 2026
 logging.py
 """
+from __future__ import annotations
+
 import logging
 import sys
+from typing import TYPE_CHECKING, Any
 
 import orjson
 import structlog
-from rich.console import Console
 
+if TYPE_CHECKING:
+    from collections.abc import Callable
 
-console = Console()
+    from structlog.types import EventDict
 
 
 def configure_logging(
@@ -32,8 +36,7 @@ def configure_logging(
         structlog.processors.add_log_level,
         structlog.processors.TimeStamper(fmt = "iso",
                                          utc = True),
-        structlog.processors.StackInfoRenderer(),
-        structlog.processors.format_exc_info,
+        _render_stack_and_exc,
     ]
 
     if redis_url:
@@ -42,10 +45,19 @@ def configure_logging(
         init_publisher(redis_url)
         shared_processors.append(redis_log_processor)
 
+    logger_factory: Any = structlog.PrintLoggerFactory()
+    processors: list[structlog.types.Processor]
     if json_mode:
+        serializer: Callable[..., str | bytes]
+        stdout_buffer = getattr(sys.stdout, "buffer", None)
+        if stdout_buffer is not None:
+            serializer = _json_serializer
+            logger_factory = structlog.BytesLoggerFactory(stdout_buffer)
+        else:
+            serializer = _json_text_serializer
         processors = [
             *shared_processors,
-            structlog.processors.JSONRenderer(serializer = _json_serializer),
+            structlog.processors.JSONRenderer(serializer = serializer),
         ]
     else:
         processors = [
@@ -57,14 +69,42 @@ def configure_logging(
         processors = processors,
         wrapper_class = structlog.make_filtering_bound_logger(log_level),
         context_class = dict,
-        logger_factory = structlog.PrintLoggerFactory(),
+        logger_factory = logger_factory,
         cache_logger_on_first_use = True,
     )
 
 
-def _json_serializer(obj: dict, **kwargs) -> str:
+_stack_info_renderer = structlog.processors.StackInfoRenderer()
+
+
+def _render_stack_and_exc(
+    logger: Any,
+    method_name: str,
+    event_dict: EventDict,
+) -> EventDict:
+    """
+    Run the stack and exception renderers only for records that carry them
+    """
+    if "stack_info" not in event_dict and "exc_info" not in event_dict:
+        return event_dict
+    event_dict = _stack_info_renderer(logger, method_name, event_dict)
+    return structlog.processors.format_exc_info(
+        logger,
+        method_name,
+        event_dict
+    )
+
+
+def _json_serializer(obj: dict, **kwargs: Any) -> bytes:
+    """
+    Serialize log entries to JSON bytes using orjson for speed
+    """
+    return orjson.dumps(obj, default = str)
+
+
+def _json_text_serializer(obj: dict, **kwargs: Any) -> str:
     """
-    Serialize log entries to JSON using orjson for speed
+    Text variant for streams that have no underlying byte buffer
     """
     return orjson.dumps(obj, default = str).decode("utf-8")
 
@@ -259,6 +259,10 @@ class CodeWormDaemon:
             self._llm_client = None
         if self.notifier:
             await self.notifier.close()
+        self.analyzer.shutdown()
+        publisher = get_publisher()
+        if publisher is not None:
+            publisher.close()
 
     def run(self) -> None:
         """
@@ -51,6 +51,17 @@ LANGUAGE_EXTENSIONS: dict[str,
                           }
 
 
+def language_for_filename(name: str) -> Language | None:
+    """
+    Map a file name or path string to its language by extension
+    Avoids building a Path just to read its suffix
+    """
+    dot = name.rfind(".")
+    if dot <= 0:
+        return None
+    return LANGUAGE_EXTENSIONS.get(name[dot :].lower())
+
+
 class RepoConfig(BaseModel):
     """
     Configuration for a source repository to scan